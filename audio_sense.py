@@ -3,46 +3,260 @@
 import os
 os.environ["QT_QPA_PLATFORM"] = "offscreen"
 
-import speech_recognition as sr
+import queue
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-def listen_and_transcribe(timeout=5, phrase_time_limit=10):
-    recognizer = sr.Recognizer()
+import numpy as np
+import speech_recognition as sr
 
-    try:
-        with sr.Microphone() as source:
-            recognizer.adjust_for_ambient_noise(source)
-            print("🎙️ Listening...")
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+START_FRAMES = 3  # Voiced frames in a row before a segment opens
+HANGOVER_SECONDS = 0.8  # Silence that closes a segment
+PRE_ROLL_SECONDS = 0.3  # Kept from before the segment opened so first syllables are not clipped
+MIN_SPEECH_SECONDS = 0.3
+MAX_SEGMENT_SECONDS = 15
+ENERGY_RATIO = 2.5  # Voiced means this much louder than the noise floor
+MIN_ENERGY = 150
+NOISE_RISE = 0.02  # Weight of a louder silent frame; the floor creeps up so speech onsets barely move it
+NOISE_FALL = 0.2  # Weight of a quieter silent frame; the gate regains its sensitivity soon after a room quiets
 
-        transcript = recognizer.recognize_google(audio)
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+def frame_energy(frame):
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
 
-        return {
-            "timestamp": timestamp,
-            "text": transcript.strip()
-        }
+class VoiceGate:
+    """Cuts a stream of 16-bit mono frames into voiced segments.
 
-    except sr.WaitTimeoutError:
-        return {
-            "timestamp": datetime.utcnow().isoformat(),
-            "text": "(No speech detected — silence)"
-        }
+    A frame is voiced when its RMS energy clears the noise floor by ENERGY_RATIO (and webrtcvad agrees,
+    when it is installed). The noise floor is a running average over frames outside speech that rises
+    slowly and falls fast, so the ambient calibration follows the room both ways instead of being redone
+    before every listen.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, start_frames=START_FRAMES,
+                 hangover_seconds=HANGOVER_SECONDS, pre_roll_seconds=PRE_ROLL_SECONDS,
+                 min_speech_seconds=MIN_SPEECH_SECONDS, max_segment_seconds=MAX_SEGMENT_SECONDS,
+                 energy_ratio=ENERGY_RATIO, min_energy=MIN_ENERGY, noise_rise=NOISE_RISE, noise_fall=NOISE_FALL):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.start_frames = start_frames
+        self.hangover_frames = max(1, int(hangover_seconds * 1000 / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_seconds * 1000 / frame_ms))
+        self.max_frames = max(1, int(max_segment_seconds * 1000 / frame_ms))
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.noise_rise = noise_rise
+        self.noise_fall = noise_fall
+        self.noise_floor = None
+        self._pre_roll = deque(maxlen=start_frames + int(pre_roll_seconds * 1000 / frame_ms))
+        self._segment = None
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._vad = None
+        try:
+            import webrtcvad
+            if frame_ms in (10, 20, 30):
+                self._vad = webrtcvad.Vad(2)
+        except ImportError:
+            pass
+
+    @property
+    def in_speech(self):
+        return self._segment is not None
+
+    def _is_voiced(self, frame, energy):
+        if energy <= max(self.min_energy, (self.noise_floor or 0.0) * self.energy_ratio):
+            return False
+        return self._vad is None or self._vad.is_speech(frame, self.sample_rate)
+
+    def feed(self, frame):
+        """Returns the PCM of a finished voiced segment, otherwise None."""
+        energy = frame_energy(frame)
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        voiced = self._is_voiced(frame, energy)
+
+        if self._segment is None:
+            self._pre_roll.append(frame)
+            if not voiced:
+                self._voiced_run = 0
+                rate = self.noise_rise if energy > self.noise_floor else self.noise_fall
+                self.noise_floor += rate * (energy - self.noise_floor)
+                return None
+            self._voiced_run += 1
+            if self._voiced_run >= self.start_frames:
+                self._segment = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silent_run = 0
+            return None
+
+        self._segment.append(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run < self.hangover_frames and len(self._segment) < self.max_frames:
+            return None
+        segment, self._segment = self._segment, None
+        self._voiced_run = 0
+        if len(segment) - self._silent_run < self.min_speech_frames:
+            return None  # A click or a cough, not speech
+        return b"".join(segment)
+
+def recognize_google(pcm, sample_rate, sample_width):
+    return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, sample_width))
+
+class AudioListener:
+    """Keeps the microphone open and transcribes only what the VoiceGate lets through.
+
+    A capture thread reads small frames and gates them; voiced segments go to a second thread for
+    transcription, so silence costs a frame read and an RMS per frame. transcribe takes
+    (pcm, sample_rate, sample_width), which also fits brainbot's TranscriptionBackend.transcribe.
+    """
 
-    except sr.UnknownValueError:
+    def __init__(self, transcribe=None, device_index=None, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS,
+                 max_pending=50, log=None, **gate_options):
+        self.transcribe = transcribe or recognize_google
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.gate = VoiceGate(sample_rate, frame_ms, **gate_options)
+        self.log = log or (lambda msg: print(msg))
+        self.error = None
+        self._transcripts = deque(maxlen=max_pending)
+        self._ready = threading.Condition()
+        self._segments = queue.Queue(maxsize=8)
+        self._pending = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    @property
+    def running(self):
+        return bool(self._threads) and self._threads[0].is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return self
+            self.error = None
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._capture_loop, daemon=True, name="mic-capture"),
+                threading.Thread(target=self._transcribe_loop, daemon=True, name="mic-transcribe")
+            ]
+            for thread in self._threads:
+                thread.start()
+            return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _capture_loop(self):
+        try:
+            with sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                               chunk_size=self.frame_samples) as source:
+                self.log("🎙️ Listening...")
+                while not self._stop.is_set():
+                    segment = self.gate.feed(source.stream.read(source.CHUNK))
+                    if segment is None:
+                        continue
+                    with self._ready:
+                        self._pending += 1
+                    try:
+                        self._segments.put_nowait(segment)
+                    except queue.Full:
+                        with self._ready:
+                            self._pending -= 1
+                        self.log("⚠️ Transcription is falling behind; dropped a speech segment.")
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._segments.put(None)
+            with self._ready:
+                self._ready.notify_all()
+
+    def _transcribe_loop(self):
+        while (segment := self._segments.get()) is not None:
+            heard = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                text = self.transcribe(segment, self.sample_rate, 2).strip()
+            except sr.UnknownValueError:
+                text = ""  # The gate let through something that was not words
+            except sr.RequestError as e:
+                text = f"(Recognition error: {e})"
+            except Exception as e:
+                text = f"(Unexpected error: {e})"
+            with self._ready:
+                self._pending -= 1
+                if text:
+                    self._transcripts.append({
+                        "timestamp": heard,
+                        "text": text,
+                        "duration": round(len(segment) / (2 * self.sample_rate), 2)
+                    })
+                self._ready.notify_all()
+
+    def collect(self, timeout=5, phrase_time_limit=10):
+        """Transcripts gathered since the last call, waiting up to timeout for one to arrive.
+
+        Speech that is still being heard or transcribed when the timeout passes gets another
+        phrase_time_limit seconds, like Recognizer.listen would.
+        """
+        deadline = time.monotonic() + timeout
+        extended = False
+        with self._ready:
+            while not self._transcripts and self.running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if extended or not (self.gate.in_speech or self._pending):
+                        break
+                    deadline += phrase_time_limit
+                    extended = True
+                    continue
+                self._ready.wait(remaining)
+            found = list(self._transcripts)
+            self._transcripts.clear()
+        return found
+
+_listener = None
+_listener_lock = threading.Lock()
+
+def audio_listener(**options):
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = AudioListener(**options)
+        return _listener.start()
+
+def listen_and_transcribe(timeout=5, phrase_time_limit=10):
+    # Served by the shared, always-open listener; returns everything heard since the previous call
+    try:
+        listener = audio_listener()
+        found = listener.collect(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    except Exception as e:
         return {
             "timestamp": datetime.utcnow().isoformat(),
-            "text": "(Speech unintelligible)"
+            "text": f"(Unexpected error: {e})"
         }
 
-    except sr.RequestError as e:
+    if found:
         return {
-            "timestamp": datetime.utcnow().isoformat(),
-            "text": f"(Recognition error: {e})"
+            "timestamp": found[0]["timestamp"],
+            "text": "\n".join(item["text"] for item in found),
+            "duration": round(sum(item["duration"] for item in found), 2)
         }
 
-    except Exception as e:
+    if listener.error:
         return {
             "timestamp": datetime.utcnow().isoformat(),
-            "text": f"(Unexpected error: {e})"
+            "text": f"(Unexpected error: {listener.error})"
         }
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "text": "(No speech detected — silence)"
+    }
@@ -0,0 +1,81 @@
+# G:\brainbot\core\bench_readers.py
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from brainbot import (analyze_documents, DocumentAccumulator, iter_text, read_text_mmap,
+                      DOCUMENT_MAX_MB)
+
+
+def make_sample(path, megabytes):
+    lines = [
+        "Plain prose with nothing to extract, just words to count and skip over.\n",
+        "what is the meaning of this line?\n",
+        "speaker: a training pair on the right of the colon\n",
+        "    indented code = line * 2  # still only words\n",
+    ]
+    block = "".join(lines) * 2048
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(max(1, megabytes * 1024 ** 2 // len(block))):
+            f.write(block)
+
+
+def full_read(path):
+    # The path read_file + analyze_content/extract_training_pairs/generate_questions used to take
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    analysis = analyze_documents([content]).row(0)
+    return analysis["summary"], len(analysis["pairs"]), len(analysis["questions"])
+
+
+def streamed(path):
+    doc = DocumentAccumulator()
+    for chunk in iter_text(path):
+        doc.feed(chunk)
+    doc.close()
+    return doc.summary, len(doc.pairs), len(doc.questions)
+
+
+def mapped(path):
+    result = read_text_mmap(path, ".txt", max_bytes=os.path.getsize(path))
+    return result["summary"], len(result["pairs"]), len(result["questions"])
+
+
+def measure(reader, path):
+    started = time.perf_counter()
+    outcome = reader(path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    reader(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return outcome, elapsed, peak
+
+
+def main():
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else min(200, DOCUMENT_MAX_MB)
+    path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "-" else None
+    cleanup = path is None
+    if cleanup:
+        path = os.path.join(tempfile.mkdtemp(), "sample.txt")
+        make_sample(path, megabytes)
+    size_mb = os.path.getsize(path) / 1024 ** 2
+    print(f"📄 {path} ({size_mb:.1f} MB)")
+    try:
+        baseline = None
+        for name, reader in (("full read", full_read), ("streamed", streamed), ("mmap", mapped)):
+            outcome, elapsed, peak = measure(reader, path)
+            baseline = baseline or elapsed
+            print(f"{name:>10}: {elapsed:6.2f}s  {size_mb / elapsed:7.1f} MB/s  "
+                  f"peak {peak / 1024 ** 2:7.1f} MB  x{baseline / elapsed:4.1f}  "
+                  f"{outcome[1]} pairs, {outcome[2]} questions")
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
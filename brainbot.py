@@ -1,5 +1,12 @@
 #G:\brainbot\core\brainbot.py
 import os, json, subprocess, threading, time, random
+import hashlib
+import re
+import sqlite3
+import queue
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
 from PIL import Image
@@ -7,70 +14,2415 @@ import pytesseract
 import speech_recognition as sr
 from docx import Document
 import difflib
+import heapq
+from itertools import islice
+import fnmatch
+import filecmp
+import stat
+import mmap
+import wave
+import importlib.util
+from collections import deque
 
 READABLE_EXTENSIONS = [".txt", ".md", ".json", ".py", ".html", ".xml", ".pdf", ".doc", ".docx", ".srt"]
 AUDIO_EXTENSIONS = [".mp3", ".wav"]
 VIDEO_EXTENSIONS = [".wmv", ".avi", ".mp4", ".mpg", ".mpeg"]
 MAX_LONGTERM_MB = 500
+FUZZY_THRESHOLD = 0.75
+FUZZY_TOP_K = 50
+MEMORY_BACKEND = "json"
+MEDIA_EXTENSIONS = frozenset(AUDIO_EXTENSIONS + VIDEO_EXTENSIONS)
+SCAN_EXTENSIONS = frozenset(READABLE_EXTENSIONS + AUDIO_EXTENSIONS + VIDEO_EXTENSIONS)
+SCAN_SKIP_DIRS = frozenset([
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".cache",
+    "$Recycle.Bin", "System Volume Information", "Windows", "Program Files", "Program Files (x86)",
+    "ProgramData", "AppData", "Recovery", "$WinREAgent"
+])
+INGEST_READERS = 4
+INGEST_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+INGEST_BATCH = 50
+INGEST_POOL_RESTARTS = 3  # Crashed worker pools replaced per run before the remaining files fail fast
+INGEST_MAX_MBPS = 40
+INGEST_MAX_CPU = 80
+CATALOG_FULL_HASH_MB = 4
+WATCH_DEBOUNCE = 2.0
+CHECKPOINT_INTERVAL = 30
+SHORTTERM_RING = 1000
+DREAM_BATCH = 500
+DREAM_MAX_REFLECTIONS = 2000
+DREAM_MAX_MB = 64
+DREAM_IDLE_SECONDS = 120
+DREAM_CHECK_INTERVAL = 15
+DREAM_HIGH_WATERMARK = 20000
+PREVIEW_CHARS = 1000
+DOCUMENT_MAX_MB = 64
+MMAP_MIN_KB = 256
+MMAP_MAX_MARKED = 0.2  # Share of ':'/'?' lines above which mmap stops beating the streamed reader
+PLAIN_TEXT_EXTENSIONS = frozenset([".txt", ".md", ".json", ".py", ".html", ".xml"])
+PDF_PARALLEL_PAGES = 40  # Longer PDFs are split into page ranges across the ingest pool
+PDF_RANGE_PAGES = 16
+PDF_PAGE_LIMIT = 0  # 0 reads every page; set it to reflect on a preview of long PDFs
+PDF_OCR_MIN_CHARS = 20  # Pages with images and less text than this are OCR'd
+PDF_OCR_DPI = 200
+TRANSCRIBE_BACKEND = "auto"  # "google" needs network; "vosk" and "sphinx" run offline; "auto" prefers vosk
+TRANSCRIBE_CHUNK_SECONDS = 30
+TRANSCRIBE_OVERLAP_SECONDS = 2  # Chunks overlap so words on a boundary are heard whole at least once
+TRANSCRIBE_WORKERS = 4
+VOSK_MODEL_DIR = "models/vosk"
+PCM_SAMPLE_RATE = 16000
+FFMPEG_MAX_PROCESSES = 2  # Decoders running at once across scans, the watcher and reflect_file
+# Keywords match whole words; a trailing * also matches longer words that start with it
+EMOTION_LEXICON = {
+    "love*": "❤️", "hate*": "💢", "sad": "😢", "sadness": "😢", "cry": "😭", "cries": "😭", "crying": "😭",
+    "angry": "😠", "happy": "😊", "fear*": "😨", "laugh*": "😂"
+}
+MOOD_LEXICON = {"truth*": "🧠", "error*": "⚠️", "purpose*": "🌱"}
+
+class MemoryIndex:
+    max_posting = 20000
+
+    def __init__(self, key, previews=True):
+        self.key = key
+        self.keep_previews = previews
+        self._lock = threading.RLock()
+        self._outputs = {}
+        self._inputs = {}
+        self._previews = []
+        self._keys = []
+        self._key_grams = []
+        self._grams = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._outputs)
+
+    def empty(self):
+        return not self._outputs and not self._previews
+
+    def load(self, reflections):
+        with self._lock:
+            self._outputs.clear()
+            self._inputs.clear()
+            self._previews.clear()
+            self._keys.clear()
+            self._key_grams.clear()
+            self._grams.clear()
+            for reflection in reflections:
+                self._add(reflection)
+            self.loaded = True
+
+    def load_once(self, source):
+        with self._lock:
+            if self.loaded:
+                return False
+            self.load(source())
+            return True
+
+    def add_reflections(self, reflections):
+        with self._lock:
+            for reflection in reflections:
+                self._add(reflection)
 
-class BrainBot:
-    def __init__(self, base_path="G:/brainbot/core", log=None, chat=None, tools=None):
+    def add_answer(self, question, answer):
+        with self._lock:
+            self._add_pair(question, answer)
+
+    def _add(self, reflection):
+        if not isinstance(reflection, dict):
+            return
+        if "question" in reflection and "answer" in reflection:
+            self._add_pair(reflection["question"], reflection["answer"])
+        pairs = reflection.get("training_pairs", [])
+        if isinstance(pairs, list):
+            for pair in pairs:
+                if isinstance(pair, (list, tuple)) and len(pair) == 2:
+                    self._add_pair(*pair)
+        preview = reflection.get("preview")
+        if preview and self.keep_previews:
+            self._previews.append((preview.lower(), {"path": reflection.get("path"), "preview": preview}))
+
+    def _add_pair(self, input_text, output_text):
+        if not input_text or not output_text:
+            return
+        mapped = self.key(str(input_text))
+        # First pair wins, matching the old scan order of respond()
+        if mapped not in self._outputs:
+            self._outputs[mapped] = output_text
+            self._inputs[mapped] = input_text
+            key_id = len(self._keys)
+            grams = self._trigrams(mapped)
+            self._keys.append(mapped)
+            self._key_grams.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key_id)
+
+    @staticmethod
+    def _trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def exact(self, mapped_input):
+        with self._lock:
+            if mapped_input in self._outputs:
+                return self._inputs[mapped_input], self._outputs[mapped_input]
+            return None
+
+    def candidates(self, mapped_input, top_k=FUZZY_TOP_K):
+        grams = self._trigrams(mapped_input)
+        if not grams:
+            return []
+        with self._lock:
+            postings = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+            # Trigrams shared by most keys (e.g. "what is") barely discriminate, so skip them
+            usable = [p for p in postings if len(p) <= self.max_posting] or postings[:1]
+            shared = {}
+            for posting in usable:
+                for key_id in posting:
+                    shared[key_id] = shared.get(key_id, 0) + 1
+            # Dice coefficient over trigram sets ranks keys before any difflib scoring
+            best = heapq.nlargest(
+                top_k, shared.items(),
+                key=lambda item: 2 * item[1] / (len(grams) + self._key_grams[item[0]])
+            )
+            return [(self._inputs[self._keys[key_id]], self._keys[key_id], self._outputs[self._keys[key_id]])
+                    for key_id, _ in best]
+
+    def fuzzy(self, mapped_input, threshold=FUZZY_THRESHOLD, top_k=FUZZY_TOP_K):
+        best = None
+        best_score = 0
+        matcher = difflib.SequenceMatcher(None, b=mapped_input)
+        for input_text, mapped_pair, output_text in self.candidates(mapped_input, top_k):
+            matcher.set_seq1(mapped_pair)
+            if matcher.real_quick_ratio() <= max(best_score, threshold) or matcher.quick_ratio() <= max(best_score, threshold):
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best = (input_text, output_text)
+        if best and best_score > threshold:
+            return best[0], best[1], best_score
+        return None
+
+    def associations(self, keyword):
+        keyword = keyword.lower()
+        with self._lock:
+            return [r for preview, r in self._previews if keyword in preview]
+
+def reflection_id(path, digest=None, content=None):
+    """Stable id for one version of a source: the same path and content always map to the same id."""
+    if digest is None:
+        digest = hashlib.blake2b((content or "").encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(os.path.normcase(str(path)).encode("utf-8", "surrogatepass"))
+    h.update(b"\0")
+    h.update(digest.encode("ascii"))
+    return h.hexdigest()
+
+
+def ensure_reflection_id(reflection):
+    # Reflections written before ids existed are keyed by their path and preview
+    rid = reflection.get("id")
+    if not rid:
+        rid = reflection["id"] = reflection_id(reflection.get("path"), content=reflection.get("preview"))
+    return rid
+
+
+class ShortTermBuffer:
+    """Undreamed reflections: a bounded in-memory ring backed by an append-only spill segment.
+
+    Every reflection is appended to buffer.jsonl so a crash loses nothing; while the
+    buffer fits in the ring, a drain is served without touching the disk again.
+    Reflections are keyed by id, so re-reflecting the same source does not inflate the count.
+    """
+
+    def __init__(self, directory, log=None, ring_size=SHORTTERM_RING):
+        self.dir = Path(directory)
+        self.log = log or (lambda msg: print(msg))
+        self.spill_path = self.dir / "buffer.jsonl"
+        self.draining_path = self.dir / "buffer.draining.jsonl"
+        self.done_path = self.dir / "buffer.draining.done"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._ring = deque(maxlen=ring_size)
+        self._spill = None
+        self._records = 0
+        self._ids = {}  # id -> line of its latest copy in the spill
+        self._draining = {}  # Same for the segment being drained; entries leave as batches are acked
+        self._recover()
+
+    def _count_records(self, path):
+        count = 0
+        with open(path, "r+b") as f:
+            data_end = 0
+            while chunk := f.read(1 << 20):
+                count += chunk.count(b"\n")
+                if b"\n" in chunk:
+                    data_end = f.tell() - len(chunk) + chunk.rindex(b"\n") + 1
+            if f.tell() != data_end:
+                # Torn final record from an interrupted append
+                f.truncate(data_end)
+                self.log(f"⚠️ Dropped a partial record from {path.name}.")
+        return count
+
+    def _drained_count(self):
+        try:
+            return int(self.done_path.read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def _set_drained_count(self, count):
+        tmp_path = self.done_path.with_suffix(".tmp")
+        tmp_path.write_text(str(count))
+        os.replace(tmp_path, self.done_path)
+
+    def _recover(self):
+        # A dream interrupted mid-drain: records past its progress marker go back in front of the spill
+        if self.draining_path.exists():
+            self._count_records(self.draining_path)
+            done = self._drained_count()
+            tmp_path = self.spill_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as out:
+                with open(self.draining_path, "rb") as f:
+                    for line in islice(f, done, None):
+                        out.write(line)
+                if self.spill_path.exists():
+                    with open(self.spill_path, "rb") as f:
+                        while chunk := f.read(1 << 20):
+                            out.write(chunk)
+            os.replace(tmp_path, self.spill_path)
+            self.draining_path.unlink()
+            self.done_path.unlink(missing_ok=True)
+        if self.spill_path.exists():
+            self._records = self._count_records(self.spill_path)
+            self._ids = self._index_segment(self.spill_path)
+        legacy = sorted(self.dir.glob("reflection_*.json"))
+        if legacy:
+            reflections = []
+            for file in legacy:
+                try:
+                    with open(file, "r", encoding="utf-8") as f:
+                        reflections.append(json.load(f))
+                except Exception as e:
+                    self.log(f"⚠️ Failed to read {file.name}: {e}")
+            self.put(reflections)
+            for file in legacy:
+                file.unlink(missing_ok=True)
+            self.log(f"🚚 Moved {len(reflections)} short-term reflection files into {self.spill_path.name}.")
+        if self._ids:
+            self.log(f"🧠 Recovered {len(self._ids)} undreamed reflections.")
+
+    def put(self, reflections):
+        if not reflections:
+            return
+        ids = [ensure_reflection_id(r) for r in reflections]
+        records = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in reflections)
+        with self._lock:
+            if self._spill is None:
+                self._spill = open(self.spill_path, "a", encoding="utf-8")
+            self._spill.write(records)
+            self._spill.flush()
+            self._ring.extend(reflections)
+            self._ids.update(zip(ids, range(self._records, self._records + len(ids))))
+            self._records += len(reflections)
+
+    def __len__(self):
+        # Undreamed records of an interrupted drain count too, or the dream triggers never see them;
+        # an id stored again during a drain is counted twice, which only makes a dream come sooner
+        return len(self._ids) + len(self._draining)
+
+    def size_mb(self):
+        # Includes the whole draining segment, acked batches and all, until the drain finishes
+        paths = (self.spill_path, self.draining_path)
+        return sum(os.path.getsize(p) for p in paths if p.exists()) / (1024 ** 2)
+
+    def _close_spill(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def close(self):
+        with self._lock:
+            self._close_spill()
+
+    def _index_segment(self, path):
+        # id -> line number of its last copy, numbered the way _drain_segment counts lines
+        latest = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                try:
+                    latest[ensure_reflection_id(json.loads(line))] = number
+                except json.JSONDecodeError:
+                    pass
+        return latest
+
+    def _read_segment(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    self.log(f"⚠️ Skipped corrupt record in {path.name}")
+
+    @staticmethod
+    def _latest(records):
+        latest = {}
+        for r in records:
+            latest[ensure_reflection_id(r)] = r
+        return list(latest.values())
+
+    def __iter__(self):
+        with self._lock:
+            if self._records <= len(self._ring):
+                return iter(self._latest(self._ring))
+        if not self.spill_path.exists():
+            return iter(())
+        return iter(self._latest(self._read_segment(self.spill_path)))
+
+    def drain_batches(self, batch_size=DREAM_BATCH):
+        """Yield undreamed reflections oldest first, at most batch_size at a time.
+
+        A batch counts as consumed once the caller asks for the next one, so a caller that
+        stops early or crashes leaves the rest for the next drain.
+        """
+        if self.draining_path.exists():
+            if not self._draining:
+                self._draining = self._index_segment(self.draining_path)
+            yield from self._drain_segment(batch_size)
+        with self._lock:
+            if not self._records:
+                return
+            cached = list(self._ring) if self._records <= len(self._ring) else None
+            self._close_spill()
+            os.replace(self.spill_path, self.draining_path)
+            self._ring.clear()
+            self._records = 0
+            self._draining, self._ids = self._ids, {}
+        yield from self._drain_segment(batch_size, cached)
+
+    def _drain_segment(self, batch_size, cached=None):
+        def records():
+            if cached is not None:
+                yield from cached
+                return
+            with open(self.draining_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        self.log(f"⚠️ Skipped corrupt record in {self.draining_path.name}")
+                        yield None
+
+        def ack(batch):
+            with self._lock:
+                for record in batch:
+                    self._draining.pop(record["id"], None)
+
+        # Only the last copy of each id is dreamed, and none at all when a newer one is already
+        # waiting in the live spill
+        latest = self._draining
+        consumed = self._drained_count()
+        batch = []
+        for number, record in enumerate(islice(records(), consumed, None), consumed):
+            consumed += 1
+            if record is None:
+                continue
+            rid = ensure_reflection_id(record)
+            if latest.get(rid) != number:
+                continue
+            if rid in self._ids:
+                ack([record])
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                ack(batch)
+                batch = []
+                self._set_drained_count(consumed)
+        if batch:
+            yield batch
+            ack(batch)
+        with self._lock:
+            self._draining = {}
+        self.draining_path.unlink(missing_ok=True)
+        self.done_path.unlink(missing_ok=True)
+
+    def drain(self):
+        return [r for batch in self.drain_batches() for r in batch]
+
+
+class JsonMemoryStore:
+    supports_search = False
+
+    def __init__(self, base_path, log=None):
         self.base = Path(base_path)
         self.log = log or (lambda msg: print(msg))
-        self.chat = chat or (lambda msg: None)
-        self.tools = tools
-        
+
         self.short_term_dir = self.base / "memory" / "shortterm"
-        self.long_term_path = self.base / "memory" / "longterm" / "longterm.json"
-        self.questions_path = self.base / "memory" / "questions" / "questions.json"
+        self.long_term_path = self.base / "memory" / "longterm" / "longterm.jsonl"
+        self.questions_path = self.base / "memory" / "questions" / "questions.jsonl"
+        self.legacy_questions_path = self.questions_path.with_suffix(".json")
         self.answered_path = self.base / "memory" / "longterm" / "permanent" / "answeredquestions.json"
         self.seen_path = self.base / "memory" / "longterm" / "seen_paths.json"
+        self.catalog_path = self.base / "memory" / "longterm" / "catalog.jsonl"
         self.last_inquiry_path = self.base / "memory" / "questions" / "last_inquiry.json"
+        self.checkpoint_dir = self.base / "memory" / "checkpoints"
 
         self.short_term_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
         self.long_term_path.parent.mkdir(parents=True, exist_ok=True)
         self.questions_path.parent.mkdir(parents=True, exist_ok=True)
         self.answered_path.parent.mkdir(parents=True, exist_ok=True)
         self.last_inquiry_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self._lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        self._catalog = None
+        self._digests = {}
+        self._catalog_records = 0
+        self._longterm_ids = None
+        self.shortterm = ShortTermBuffer(self.short_term_dir, log=self.log)
+
+    def close(self):
+        self.shortterm.close()
+
+    def put_reflection(self, reflection):
+        return self.put_reflections([reflection])[0]
+
+    def put_reflections(self, reflections):
+        self.shortterm.put(reflections)
+        return [r.get("path") for r in reflections]
+
+    def shortterm_count(self):
+        return len(self.shortterm)
+
+    def shortterm_size_mb(self):
+        return self.shortterm.size_mb()
+
+    def iter_shortterm(self):
+        return iter(self.shortterm)
+
+    def drain_shortterm(self):
+        return self.shortterm.drain()
+
+    def drain_shortterm_batches(self, batch_size=DREAM_BATCH):
+        return self.shortterm.drain_batches(batch_size)
+
+    def append_longterm(self, reflections):
+        with self._lock:
+            if self._longterm_ids is None:
+                self._longterm_ids = {ensure_reflection_id(r) for r in self.iter_longterm()}
+            fresh = []
+            fresh_ids = set()
+            for r in reflections:
+                rid = ensure_reflection_id(r)
+                if rid not in self._longterm_ids and rid not in fresh_ids:
+                    fresh_ids.add(rid)
+                    fresh.append(r)
+            with open(self.long_term_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in fresh))
+                # dream() drops the short-term copies once this returns
+                f.flush()
+                os.fsync(f.fileno())
+            # Only ids that are on disk count as stored; a failed write leaves the batch to be retried
+            self._longterm_ids.update(fresh_ids)
+        return fresh
+
+    def longterm_size_mb(self):
+        return sum(os.path.getsize(p) for p in self._longterm_segments()) / (1024 ** 2)
+
+    def partition_longterm(self):
+        with self._lock:
+            if not self.long_term_path.exists():
+                return
+            size_mb = os.path.getsize(self.long_term_path) / (1024 ** 2)
+            if size_mb <= MAX_LONGTERM_MB:
+                return
+            stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            outpath = self.long_term_path.with_name(f"longterm_{stamp}.jsonl")
+            os.replace(self.long_term_path, outpath)
+        self.log(f"✂️ Rolled long-term segment to {outpath.name} ({size_mb:.1f} MB).")
+
+    def _longterm_segments(self):
+        rolled = sorted(self.long_term_path.parent.glob("longterm_*.jsonl"))
+        if self.long_term_path.exists():
+            rolled.append(self.long_term_path)
+        return rolled
+
+    def _legacy_longterm_files(self):
+        return sorted(self.long_term_path.parent.glob("longterm*.json"))
+
+    def iter_longterm(self):
+        for file in self._legacy_longterm_files():
+            try:
+                with open(file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                yield from (data if isinstance(data, list) else [data])
+            except Exception as e:
+                self.log(f"⚠️ Failed to read memory file: {file.name} — {e}")
+        for segment in self._longterm_segments():
+            try:
+                with open(segment, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            # A torn final line from an interrupted append
+                            self.log(f"⚠️ Skipped corrupt record in {segment.name}")
+            except Exception as e:
+                self.log(f"⚠️ Failed to read memory file: {segment.name} — {e}")
+
+    def migrate(self):
+        for file in self._legacy_longterm_files():
+            try:
+                with open(file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, list):
+                    data = [data]
+                if file.stem == "longterm":
+                    stamp = datetime.utcfromtimestamp(file.stat().st_mtime).strftime('%Y%m%d_%H%M%S')
+                    outpath = file.with_name(f"longterm_{stamp}.jsonl")
+                else:
+                    outpath = file.with_suffix(".jsonl")
+                tmp_path = outpath.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for record in data:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                os.replace(tmp_path, outpath)
+                file.rename(file.with_name(file.name + ".migrated"))
+                self.log(f"🚚 Migrated {file.name} to {outpath.name} ({len(data)} entries).")
+            except Exception as e:
+                self.log(f"❌ Failed to migrate {file.name}: {e}")
+        self._migrate_questions()
+
+    def _migrate_questions(self):
+        legacy = self.legacy_questions_path
+        if not legacy.exists():
+            return
+        try:
+            with self._lock:
+                data = self._load_list(legacy)
+                tmp_path = self.questions_path.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for question in data:
+                        f.write(json.dumps(question, ensure_ascii=False) + "\n")
+                    if self.questions_path.exists():
+                        with open(self.questions_path, "r", encoding="utf-8") as newer:
+                            f.writelines(newer)
+                os.replace(tmp_path, self.questions_path)
+                legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+            self.log(f"🚚 Migrated {legacy.name} to {self.questions_path.name} ({len(data)} entries).")
+        except Exception as e:
+            self.log(f"❌ Failed to migrate {legacy.name}: {e}")
+
+    def _load_list(self, path):
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def append_questions(self, questions):
+        # Append-only: a dream calls this once per batch
+        if not questions:
+            return
+        records = "".join(json.dumps(q, ensure_ascii=False) + "\n" for q in questions)
+        with self._lock:
+            with open(self.questions_path, "a", encoding="utf-8") as f:
+                f.write(records)
+
+    def iter_questions(self):
+        # Questions from before the JSONL log come first until migrate() folds them in
+        yield from self._load_list(self.legacy_questions_path)
+        if not self.questions_path.exists():
+            return
+        with open(self.questions_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    self.log(f"⚠️ Skipped corrupt record in {self.questions_path.name}")
+
+    def append_answered(self, question, answer):
+        with self._lock:
+            existing = self._load_list(self.answered_path)
+            existing.append({
+                "question": question,
+                "answer": answer,
+                "next": None
+            })
+            with open(self.answered_path, "w", encoding="utf-8") as f:
+                json.dump(existing, f, indent=2)
+
+    def iter_answered(self):
+        return iter(self._load_list(self.answered_path))
+
+    def _load_catalog(self):
+        if self._catalog is not None:
+            return self._catalog
+        catalog = {}
+        records = 0
+        if self.catalog_path.exists():
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    catalog[entry["path"]] = entry
+                    records += 1
+        else:
+            # Paths from the old seen list have no stat yet; is_seen fills it in on first encounter
+            for path in self._load_list(self.seen_path):
+                catalog[path] = {"path": path, "mtime": None, "size": None, "digest": None}
+        self._catalog = catalog
+        self._digests = {e["digest"]: p for p, e in catalog.items() if e.get("digest")}
+        self._catalog_records = records
+        if catalog and not records:
+            self._compact_catalog()
+        return catalog
+
+    def _compact_catalog(self):
+        tmp_path = self.catalog_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._catalog.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.catalog_path)
+        self._catalog_records = len(self._catalog)
+
+    def catalog_get(self, path):
+        with self._catalog_lock:
+            return self._load_catalog().get(path)
+
+    def catalog_put(self, entries):
+        if not entries:
+            return
+        with self._catalog_lock:
+            catalog = self._load_catalog()
+            with open(self.catalog_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+            for entry in entries:
+                catalog[entry["path"]] = entry
+                if entry.get("digest"):
+                    self._digests[entry["digest"]] = entry["path"]
+            self._catalog_records += len(entries)
+            if self._catalog_records > 2 * len(catalog) + 10000:
+                self._compact_catalog()
+
+    def catalog_find_digest(self, digest):
+        with self._catalog_lock:
+            self._load_catalog()
+            return self._digests.get(digest)
+
+    def catalog_count(self):
+        with self._catalog_lock:
+            return len(self._load_catalog())
+
+    def iter_catalog(self):
+        with self._catalog_lock:
+            return iter(list(self._load_catalog().values()))
+
+    def get_last_inquiry(self):
+        if not self.last_inquiry_path.exists():
+            return None
+        with open(self.last_inquiry_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("last_question")
+
+    def set_last_inquiry(self, question):
+        with open(self.last_inquiry_path, "w", encoding="utf-8") as f:
+            json.dump({"last_question": question}, f, indent=2)
+
+    def save_checkpoint(self, name, state):
+        path = self.checkpoint_dir / f"{name}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, name):
+        path = self.checkpoint_dir / f"{name}.json"
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def clear_checkpoint(self, name):
+        path = self.checkpoint_dir / f"{name}.json"
+        if path.exists():
+            path.unlink()
+
+    def list_checkpoints(self):
+        return [path.stem for path in self.checkpoint_dir.glob("*.json")]
+
+    def search_previews(self, keyword):
+        return None
+
+class SqliteMemoryStore:
+    supports_search = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shortterm (
+            id INTEGER PRIMARY KEY,
+            rid TEXT,
+            path TEXT,
+            timestamp TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS shortterm_path ON shortterm(path);
+        CREATE TABLE IF NOT EXISTS longterm (
+            id INTEGER PRIMARY KEY,
+            rid TEXT,
+            path TEXT,
+            timestamp TEXT,
+            source_type TEXT,
+            memory_tag TEXT,
+            preview TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS longterm_path ON longterm(path);
+        CREATE INDEX IF NOT EXISTS longterm_timestamp ON longterm(timestamp);
+        CREATE INDEX IF NOT EXISTS longterm_source_type ON longterm(source_type);
+        CREATE INDEX IF NOT EXISTS longterm_memory_tag ON longterm(memory_tag);
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY,
+            question TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS answered (
+            id INTEGER PRIMARY KEY,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            next TEXT
+        );
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            mtime REAL,
+            size INTEGER,
+            digest TEXT,
+            rid TEXT
+        );
+        CREATE INDEX IF NOT EXISTS files_digest ON files(digest);
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # Databases created before reflection ids get the column added before these indexes are built
+    RID_COLUMNS = ("shortterm", "longterm", "files")
+    RID_INDEXES = """
+        CREATE UNIQUE INDEX IF NOT EXISTS shortterm_rid ON shortterm(rid);
+        CREATE UNIQUE INDEX IF NOT EXISTS longterm_rid ON longterm(rid);
+    """
+
+    def __init__(self, db_path, log=None, legacy_base=None):
+        self.db_path = Path(db_path)
+        self.log = log or (lambda msg: print(msg))
+        self.legacy_base = legacy_base
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        for table in self.RID_COLUMNS:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if "rid" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN rid TEXT")
+        conn.executescript(self.RID_INDEXES)
+        self._fts = self._create_fts(conn)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_fts(self, conn):
+        # trigram keeps substring semantics of the old preview search; older SQLite falls back to words
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                with conn:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS longterm_fts USING fts5("
+                        f"preview, content='longterm', content_rowid='id', tokenize='{tokenizer}')"
+                    )
+                    conn.execute(
+                        "CREATE TRIGGER IF NOT EXISTS longterm_ai AFTER INSERT ON longterm BEGIN "
+                        "INSERT INTO longterm_fts(rowid, preview) VALUES (new.id, new.preview); END"
+                    )
+                    conn.execute(
+                        "CREATE TRIGGER IF NOT EXISTS longterm_ad AFTER DELETE ON longterm BEGIN "
+                        "INSERT INTO longterm_fts(longterm_fts, rowid, preview) VALUES ('delete', old.id, old.preview); END"
+                    )
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        self.log("⚠️ SQLite FTS5 unavailable; preview search falls back to LIKE.")
+        return None
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _write(self, sql, rows):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany(sql, rows)
+
+    def _get_state(self, key):
+        row = self._conn().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_state(self, key, value):
+        self._write("INSERT OR REPLACE INTO state(key, value) VALUES (?, ?)", [(key, json.dumps(value))])
+
+    def put_reflection(self, reflection):
+        return self.put_reflections([reflection])[0]
+
+    def put_reflections(self, reflections):
+        self._write(
+            "INSERT INTO shortterm(rid, path, timestamp, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(rid) DO UPDATE SET path = excluded.path, timestamp = excluded.timestamp, data = excluded.data",
+            [(ensure_reflection_id(r), r.get("path"), r.get("timestamp"), json.dumps(r, ensure_ascii=False))
+             for r in reflections]
+        )
+        return [r.get("path") for r in reflections]
+
+    def shortterm_count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM shortterm").fetchone()[0]
+
+    def shortterm_size_mb(self):
+        return self._conn().execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM shortterm").fetchone()[0] / (1024 ** 2)
+
+    def iter_shortterm(self):
+        for (data,) in self._conn().execute("SELECT data FROM shortterm ORDER BY id"):
+            yield json.loads(data)
+
+    def drain_shortterm(self):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                rows = conn.execute("SELECT id, data FROM shortterm ORDER BY id").fetchall()
+                if rows:
+                    conn.execute("DELETE FROM shortterm WHERE id <= ?", (rows[-1][0],))
+        return [json.loads(data) for _, data in rows]
+
+    def drain_shortterm_batches(self, batch_size=DREAM_BATCH):
+        # Rows are deleted only after the caller has taken the next batch, i.e. committed this one
+        conn = self._conn()
+        last_id = conn.execute("SELECT MAX(id) FROM shortterm").fetchone()[0]
+        after = 0
+        while last_id is not None:
+            rows = conn.execute("SELECT id, data FROM shortterm WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                                (after, last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [json.loads(data) for _, data in rows]
+            after = rows[-1][0]
+            with self._write_lock:
+                with conn:
+                    conn.execute("DELETE FROM shortterm WHERE id <= ?", (after,))
+
+    def append_longterm(self, reflections):
+        batch = {}
+        for r in reflections:
+            batch.setdefault(ensure_reflection_id(r), r)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                rids = list(batch)
+                for i in range(0, len(rids), 500):
+                    chunk = rids[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    for (rid,) in conn.execute(f"SELECT rid FROM longterm WHERE rid IN ({placeholders})", chunk):
+                        del batch[rid]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO longterm(rid, path, timestamp, source_type, memory_tag, preview, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(rid, r.get("path"), r.get("timestamp"), r.get("source_type"), r.get("memory_tag"),
+                      r.get("preview"), json.dumps(r, ensure_ascii=False)) for rid, r in batch.items()]
+                )
+        return list(batch.values())
+
+    def iter_longterm(self):
+        for (data,) in self._conn().execute("SELECT data FROM longterm ORDER BY id"):
+            yield json.loads(data)
+
+    def longterm_size_mb(self):
+        return sum(os.path.getsize(p) for p in (self.db_path, Path(f"{self.db_path}-wal")) if p.exists()) / (1024 ** 2)
+
+    def partition_longterm(self):
+        # Rows are indexed in place; there is no whole-file blob to split
+        return
+
+    def migrate(self):
+        if self.legacy_base is None or self._get_state("imported_json"):
+            return
+        legacy = JsonMemoryStore(self.legacy_base, log=self.log)
+        imported = 0
+        batch = []
+        for reflection in legacy.iter_longterm():
+            batch.append(reflection)
+            if len(batch) >= 1000:
+                imported += len(self.append_longterm(batch))
+                batch = []
+        if batch:
+            imported += len(self.append_longterm(batch))
+        self.put_reflections(list(legacy.iter_shortterm()))
+        legacy.drain_shortterm()
+        self.append_questions(list(legacy.iter_questions()))
+        self._write(
+            "INSERT INTO answered(question, answer, next) VALUES (?, ?, ?)",
+            [(a["question"], a["answer"], a.get("next")) for a in legacy.iter_answered()]
+        )
+        self.catalog_put(list(legacy.iter_catalog()))
+        last = legacy.get_last_inquiry()
+        if last:
+            self.set_last_inquiry(last)
+        self._set_state("imported_json", True)
+        self.log(f"🚚 Imported {imported} long-term reflections from JSON memory into SQLite.")
+
+    def append_questions(self, questions):
+        self._write("INSERT INTO questions(question) VALUES (?)", [(q,) for q in questions])
+
+    def iter_questions(self):
+        for (question,) in self._conn().execute("SELECT question FROM questions ORDER BY id"):
+            yield question
+
+    def append_answered(self, question, answer):
+        self._write("INSERT INTO answered(question, answer, next) VALUES (?, ?, NULL)", [(question, answer)])
+
+    def iter_answered(self):
+        for question, answer, next_question in self._conn().execute(
+                "SELECT question, answer, next FROM answered ORDER BY id"):
+            yield {"question": question, "answer": answer, "next": next_question}
+
+    def catalog_get(self, path):
+        row = self._conn().execute("SELECT mtime, size, digest, rid FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        return {"path": path, "mtime": row[0], "size": row[1], "digest": row[2], "id": row[3]}
+
+    def catalog_put(self, entries):
+        self._write(
+            "INSERT OR REPLACE INTO files(path, mtime, size, digest, rid) VALUES (?, ?, ?, ?, ?)",
+            [(e["path"], e.get("mtime"), e.get("size"), e.get("digest"), e.get("id")) for e in entries]
+        )
+
+    def catalog_find_digest(self, digest):
+        row = self._conn().execute("SELECT path FROM files WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def catalog_count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def get_last_inquiry(self):
+        return self._get_state("last_inquiry")
+
+    def set_last_inquiry(self, question):
+        self._set_state("last_inquiry", question)
+
+    def save_checkpoint(self, name, state):
+        self._set_state(f"checkpoint:{name}", state)
+
+    def load_checkpoint(self, name):
+        return self._get_state(f"checkpoint:{name}")
+
+    def clear_checkpoint(self, name):
+        self._write("DELETE FROM state WHERE key = ?", [(f"checkpoint:{name}",)])
+
+    def list_checkpoints(self):
+        rows = self._conn().execute("SELECT key FROM state WHERE key LIKE 'checkpoint:%'")
+        return [key.split(":", 1)[1] for (key,) in rows]
+
+    def search_previews(self, keyword):
+        conn = self._conn()
+        if (self._fts == "trigram" and len(keyword) >= 3) or self._fts == "unicode61":
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            rows = conn.execute(
+                "SELECT path, preview FROM longterm WHERE id IN "
+                "(SELECT rowid FROM longterm_fts WHERE longterm_fts MATCH ?) ORDER BY id",
+                (phrase,)
+            )
+        else:
+            pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = conn.execute(
+                "SELECT path, preview FROM longterm WHERE preview LIKE ? ESCAPE '\\' ORDER BY id",
+                (pattern,)
+            )
+        return [{"path": path, "preview": preview} for path, preview in rows]
+
+def open_memory_store(backend, base_path, log=None):
+    base = Path(base_path)
+    if backend == "sqlite":
+        return SqliteMemoryStore(base / "memory" / "brainbot.db", log=log, legacy_base=base)
+    if backend == "json":
+        return JsonMemoryStore(base, log=log)
+    raise ValueError(f"Unknown memory backend: {backend}")
+
+def analyze_text(content):
+    if not content:
+        return "No readable content found."
+    lines = content.strip().splitlines()
+    words = content.strip().split()
+    preview = lines[0] if lines else "No preview available."
+    return f"{len(words)} words across {len(lines)} lines. Preview: {preview[:80]}"
+
+def extract_pairs(content):
+    pairs = []
+    for line in content.strip().splitlines():
+        if ":" in line:
+            parts = line.split(":", 1)
+            input_text = parts[0].strip()
+            output_text = parts[1].strip()
+            if input_text and output_text:
+                pairs.append((input_text, output_text))
+    return pairs
+
+def find_questions(content):
+    return [line.strip() for line in content.strip().splitlines() if "?" in line and len(line) < 200]
+
+def _int_column(values):
+    try:
+        import numpy as np
+    except ImportError:
+        return values
+    return np.fromiter(values, dtype=np.int64, count=len(values))
+
+class TextAnalysis:
+    """Columnar results of analyze_documents: every column holds one entry per document."""
+
+    def __init__(self, words, lines, summaries, pairs, questions):
+        self.words = _int_column(words)
+        self.lines = _int_column(lines)
+        self.summaries = summaries
+        self.pairs = pairs
+        self.questions = questions
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def row(self, i):
+        return {"summary": self.summaries[i], "pairs": self.pairs[i], "questions": self.questions[i]}
+
+    def total_words(self):
+        # A numpy column sums natively; without numpy it is a plain list
+        if hasattr(self.words, "sum"):
+            return int(self.words.sum())
+        return sum(self.words)
+
+    def all_pairs(self):
+        return [pair for pairs in self.pairs for pair in pairs]
+
+    def all_questions(self):
+        return [question for questions in self.questions for question in questions]
+
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+class DocumentAccumulator:
+    """Analyses one document fed in chunks, keeping only its preview, pairs and questions.
+
+    Chunks may end mid-line. The results match analyze_text, extract_pairs and find_questions
+    on the concatenated text, up to max_chars characters.
+    """
+
+    def __init__(self, preview_chars=PREVIEW_CHARS, max_chars=None):
+        self.preview_chars = preview_chars
+        self.max_chars = max_chars
+        self.chars = 0
+        self.words = 0
+        self.lines = 0
+        self.first_line = None
+        self.pairs = []
+        self.questions = []
+        self.truncated = False
+        self._preview = []
+        self._preview_len = 0
+        self._partial = ""
+        self._blank = 0
+
+    def feed(self, text):
+        """Add the next chunk; returns False once max_chars is reached and no more is wanted."""
+        if not text:
+            return True
+        if self.max_chars is not None and self.chars + len(text) >= self.max_chars:
+            text = text[:self.max_chars - self.chars]
+            self.truncated = True
+        self.chars += len(text)
+        if self._preview_len < self.preview_chars:
+            piece = text[:self.preview_chars - self._preview_len]
+            self._preview.append(piece)
+            self._preview_len += len(piece)
+        if text:
+            text = self._partial + text
+            lines = text.splitlines()
+            if text[-1] == "\r":
+                # Might be the first half of a \r\n split across chunks
+                self._partial = lines.pop() + "\r"
+            else:
+                self._partial = "" if text[-1] in _LINE_BREAKS else lines.pop()
+            self._add_lines(lines)
+        return not self.truncated
+
+    def _add_lines(self, lines):
+        pairs = self.pairs
+        questions = self.questions
+        words_total = self.words
+        lines_total = self.lines
+        blank = self._blank
+        for line in lines:
+            words = line.split()
+            if not words:
+                # Blank lines count only between content lines, as after content.strip()
+                if self.first_line is not None:
+                    blank += 1
+                continue
+            if self.first_line is None:
+                line = line.lstrip()
+                self.first_line = line
+            lines_total += blank + 1
+            blank = 0
+            words_total += len(words)
+            if ":" in line:
+                input_text, _, output_text = line.partition(":")
+                input_text = input_text.strip()
+                output_text = output_text.strip()
+                if input_text and output_text:
+                    pairs.append((input_text, output_text))
+            if "?" in line and len(line) < 200:
+                questions.append(line.strip())
+        self.words = words_total
+        self.lines = lines_total
+        self._blank = blank
+
+    def close(self):
+        if self._partial:
+            self._add_lines(self._partial.splitlines())
+            self._partial = ""
+        if self.lines == 1:
+            # The only line is also the last one, whose trailing whitespace strip() removes
+            self.first_line = self.first_line.rstrip()
+        return self
+
+    @property
+    def preview(self):
+        return "".join(self._preview)
+
+    @property
+    def summary(self):
+        if not self.chars:
+            return "No readable content found."
+        preview = self.first_line if self.first_line is not None else "No preview available."
+        return f"{self.words} words across {self.lines} lines. Preview: {preview[:80]}"
+
+def analyze_documents(contents):
+    """Summary, training pairs and questions for many documents, splitting each into lines once.
+
+    Produces the same values as analyze_text, extract_pairs and find_questions.
+    """
+    words, lines, summaries, pairs, questions = [], [], [], [], []
+    for content in contents:
+        doc = DocumentAccumulator(preview_chars=0)
+        doc.feed(content)
+        doc.close()
+        words.append(doc.words)
+        lines.append(doc.lines)
+        summaries.append(doc.summary)
+        pairs.append(doc.pairs)
+        questions.append(doc.questions)
+    return TextAnalysis(words, lines, summaries, pairs, questions)
+
+class KeywordTagger:
+    """Tags text from keyword lexicons with one compiled regex pass.
+
+    Each lexicon maps keywords to glyphs for one reflection field ("emotion", "mood", ...);
+    when several keywords of a field occur, the one listed first wins.
+    """
+
+    def __init__(self, lexicons=None):
+        if lexicons is None:
+            lexicons = {"emotion": EMOTION_LEXICON, "mood": MOOD_LEXICON}
+        self.lexicons = {field: dict(lexicon) for field, lexicon in lexicons.items()}
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            extra = json.load(f)
+        tagger = cls()
+        for field, lexicon in extra.items():
+            tagger.lexicons.setdefault(field, {}).update(lexicon)
+        tagger._compile()
+        return tagger
+
+    def add_lexicon(self, field, lexicon):
+        self.lexicons.setdefault(field, {}).update(lexicon)
+        self._compile()
+
+    def _compile(self):
+        self._exact = {}
+        self._prefixes = {}
+        self._resolved = {}
+        words = {}
+        for field, lexicon in self.lexicons.items():
+            for rank, (keyword, glyph) in enumerate(lexicon.items()):
+                word = keyword.lower()
+                prefix = word.endswith("*")
+                word = word.rstrip("*")
+                if not word:
+                    continue
+                (self._prefixes if prefix else self._exact).setdefault(word, []).append((field, rank, glyph))
+                words[word] = words.get(word, False) or prefix
+        self._pattern = re.compile(r"\b" + self._trie_pattern(words) + r"\b") if words else None
+
+    @staticmethod
+    def _trie_pattern(words):
+        # Shared prefixes are factored out so the regex engine never re-reads the same letters per keyword
+        trie = {}
+        for word, prefix in words.items():
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = node.get("", False) or prefix
+
+        def emit(node):
+            end = node.get("")
+            branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return r"\w*" if end else ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if end is None:
+                return body
+            return f"(?:{body}|\\w*)" if end else f"(?:{body})?"
+
+        return emit(trie)
+
+    def _lookup(self, word):
+        hits = self._resolved.get(word)
+        if hits is None:
+            hits = list(self._exact.get(word, ()))
+            for end in range(len(word), 0, -1):
+                hits.extend(self._prefixes.get(word[:end], ()))
+            if len(self._resolved) < 100000:
+                self._resolved[word] = hits
+        return hits
+
+    def tag(self, text):
+        return self.tag_many([text])[0]
+
+    def tag_many(self, texts):
+        """Return one {field: glyph} dict per text."""
+        found = []
+        for text in texts:
+            tags = {}
+            if self._pattern is not None and text:
+                for word in self._pattern.findall(text.lower()):
+                    for field, rank, glyph in self._lookup(word):
+                        if field not in tags or rank < tags[field][0]:
+                            tags[field] = (rank, glyph)
+            found.append({field: glyph for field, (_, glyph) in tags.items()})
+        return found
+
+    def apply(self, reflections):
+        previews = [r.get("preview", "") for r in reflections]
+        for reflection, tags in zip(reflections, self.tag_many(previews)):
+            reflection.update(tags)
+        return reflections
+
+_ffmpeg_slots = threading.BoundedSemaphore(FFMPEG_MAX_PROCESSES)
+
+def _ffmpeg_failure(path, code, errors):
+    detail = " | ".join(line for line in errors if line) or "no error output"
+    return RuntimeError(f"ffmpeg exited with {code} for {path}: {detail}")
+
+def iter_pcm(path, block, sample_rate=PCM_SAMPLE_RATE):
+    """Decode any audio or video file with ffmpeg, yielding mono 16-bit PCM from its stdout in block-byte pieces.
+
+    Nothing touches the disk. At most FFMPEG_MAX_PROCESSES decoders run at once; a slot is held until
+    the generator finishes or is closed. A failed decode raises RuntimeError with ffmpeg's last messages.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", path,
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate), "-ac", "1", "pipe:1"
+    ]
+    with _ffmpeg_slots:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        errors = deque(maxlen=5)
+        # stderr is drained alongside so a chatty ffmpeg can never block on a full pipe
+        drain = threading.Thread(target=lambda: errors.extend(
+            line.decode("utf-8", "replace").strip() for line in proc.stderr), daemon=True)
+        drain.start()
+        completed = False
+        try:
+            while data := proc.stdout.read(block):
+                yield data
+            completed = True
+        finally:
+            if not completed:
+                proc.kill()
+            proc.stdout.close()
+            code = proc.wait()
+            drain.join()
+            proc.stderr.close()
+    if code:
+        raise _ffmpeg_failure(path, code, errors)
+
+class TranscriptionBackend(ABC):
+    """Turns one chunk of PCM into text. Instances are pickled into the ingest pool, so keep them small."""
+    name = None
+    offline = False
+
+    @abstractmethod
+    def transcribe(self, pcm, sample_rate, sample_width):
+        """Text spoken in the chunk; "" when nothing intelligible was said."""
+
+class GoogleBackend(TranscriptionBackend):
+    name = "google"
+
+    def _recognize(self, recognizer, audio):
+        return recognizer.recognize_google(audio)
+
+    def transcribe(self, pcm, sample_rate, sample_width):
+        try:
+            return self._recognize(sr.Recognizer(), sr.AudioData(pcm, sample_rate, sample_width))
+        except sr.UnknownValueError:
+            return ""  # Silence or nothing intelligible in this chunk
+
+class SphinxBackend(GoogleBackend):
+    name = "sphinx"
+    offline = True
+
+    def _recognize(self, recognizer, audio):
+        return recognizer.recognize_sphinx(audio)
+
+class VoskBackend(TranscriptionBackend):
+    name = "vosk"
+    offline = True
+    _models = {}  # Per process, so each pool worker loads the model once
+
+    def __init__(self, model_path):
+        self.model_path = str(model_path)
+
+    def _model(self):
+        model = VoskBackend._models.get(self.model_path)
+        if model is None:
+            from vosk import Model
+            model = VoskBackend._models[self.model_path] = Model(self.model_path)
+        return model
+
+    def transcribe(self, pcm, sample_rate, sample_width):
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self._model(), sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+def open_transcription_backend(name, base_path):
+    model_path = Path(base_path) / VOSK_MODEL_DIR
+    if name == "auto":
+        name = "vosk" if model_path.is_dir() and importlib.util.find_spec("vosk") else "google"
+    if name == "vosk":
+        return VoskBackend(model_path)
+    if name == "sphinx":
+        return SphinxBackend()
+    if name == "google":
+        return GoogleBackend()
+    raise ValueError(f"Unknown transcription backend: {name}")
+
+def audio_chunks(path, chunk_seconds=TRANSCRIBE_CHUNK_SECONDS, overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS):
+    """(start frame, frame count) of each overlapping chunk of a WAV file."""
+    with wave.open(path, "rb") as w:
+        rate = w.getframerate()
+        total = w.getnframes()
+    size = max(1, int(chunk_seconds * rate))
+    overlap = min(size - 1, int(overlap_seconds * rate))
+    # A last chunk that would only repeat the previous overlap is left out
+    return [(start, min(size, total - start)) for start in range(0, max(1, total - overlap), size - overlap)]
+
+def transcribe_pcm(backend, pcm, sample_rate, sample_width):
+    # Runs in the ingest pool
+    return backend.transcribe(pcm, sample_rate, sample_width) if pcm else ""
+
+def transcribe_chunk(backend, path, start, frames):
+    # Runs in the ingest pool: each task reads its own slice of the WAV instead of being sent the PCM
+    with wave.open(path, "rb") as w:
+        w.setpos(start)
+        pcm = w.readframes(frames)
+        sample_rate = w.getframerate()
+        sample_width = w.getsampwidth()
+    return transcribe_pcm(backend, pcm, sample_rate, sample_width)
+
+def merge_transcripts(texts, max_overlap=12):
+    """Join chunk transcripts, dropping words repeated across the overlap between neighbours."""
+    words = []
+    for text in texts:
+        new = text.split()
+        overlap = 0
+        for size in range(min(max_overlap, len(words), len(new)), 0, -1):
+            if [w.strip(".,!?").lower() for w in words[-size:]] == [w.strip(".,!?").lower() for w in new[:size]]:
+                overlap = size
+                break
+        words.extend(new[overlap:])
+    return " ".join(words)
+
+class Transcriber:
+    """Transcribes audio and video files in overlapping chunks on a worker pool.
+
+    Transcripts are cached by file digest and backend name, so re-scanning unchanged media never
+    transcribes it again.
+    """
+
+    def __init__(self, backend, cache_dir=None, chunk_seconds=TRANSCRIBE_CHUNK_SECONDS,
+                 overlap_seconds=TRANSCRIBE_OVERLAP_SECONDS, workers=TRANSCRIBE_WORKERS):
+        self.backend = backend
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _cache_path(self, digest):
+        return self.cache_dir / f"{digest}.{self.backend.name}.txt"
+
+    def cached(self, digest):
+        if self.cache_dir is None or not digest:
+            return None
+        try:
+            return self._cache_path(digest).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _remember(self, digest, text):
+        path = self._cache_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _worker_pool(self):
+        # Chunks are mostly waiting on the engine or the network, so threads are enough outside the ingest pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transcribe")
+            return self._pool
+
+    @staticmethod
+    def _is_plain_wav(path):
+        # Mono 16-bit WAVs are sliced in place; everything else is decoded through ffmpeg
+        if not path.lower().endswith(".wav"):
+            return False
+        try:
+            with wave.open(path, "rb") as w:
+                return w.getnchannels() == 1 and w.getsampwidth() == 2
+        except (wave.Error, EOFError):
+            return False
+
+    def _chunk_tasks(self, path, pool):
+        if self._is_plain_wav(path):
+            for start, frames in audio_chunks(path, self.chunk_seconds, self.overlap_seconds):
+                yield pool.submit(transcribe_chunk, self.backend, path, start, frames)
+            return
+        overlap = int(self.overlap_seconds * PCM_SAMPLE_RATE) * 2
+        step = max(2, int(self.chunk_seconds * PCM_SAMPLE_RATE) * 2 - overlap)
+        tail = b""
+        pcm = iter_pcm(path, step)
+        try:
+            for data in pcm:
+                chunk = tail + data
+                tail = chunk[-overlap:] if overlap else b""
+                yield pool.submit(transcribe_pcm, self.backend, chunk, PCM_SAMPLE_RATE, 2)
+        finally:
+            pcm.close()
+
+    def transcribe(self, path, pool=None, digest=None):
+        if digest is None and self.cache_dir is not None:
+            digest = file_digest(path)
+        text = self.cached(digest)
+        if text is not None:
+            return text
+        pool = pool or self._worker_pool()
+        tasks = self._chunk_tasks(path, pool)
+        pending = deque()
+        texts = []
+        try:
+            for future in tasks:
+                pending.append(future)
+                # Bound the decoded audio held in flight; ffmpeg waits on the pipe meanwhile
+                while len(pending) > self.workers * 2:
+                    texts.append(pending.popleft().result())
+            while pending:
+                texts.append(pending.popleft().result())
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        finally:
+            tasks.close()
+        text = merge_transcripts(texts, max_overlap=max(4, int(self.overlap_seconds * 4)))
+        if digest and self.cache_dir is not None:
+            self._remember(digest, text)
+        return text
+
+def media_source(ext):
+    """(tools, source_type) recorded for a transcribed media file."""
+    if ext in VIDEO_EXTENSIONS:
+        return ["ffmpeg", "transcription"], "video"
+    return ["transcription"], "audio"
+
+def analyze_source(path, ext, content, tools, source_type):
+    # Runs in the ingest process pool, so it must stay a picklable module-level function
+    result = {"path": path, "ext": ext, "content": content, "tools": tools, "source_type": source_type}
+    if content:
+        result.update(analyze_documents([content]).row(0))
+    return result
+
+def iter_text(path, block=1 << 16):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while chunk := f.read(block):
+            yield chunk
+
+def _open_pdf(path):
+    import fitz
+    doc = fitz.open(path)
+    if doc.page_count == 0:
+        doc.close()
+        raise ValueError("Empty or invalid PDF")
+    return doc
+
+def _is_scanned(page, text):
+    return len(text.strip()) < PDF_OCR_MIN_CHARS and bool(page.get_images())
+
+def _ocr_page(page, dpi=PDF_OCR_DPI):
+    pixmap = page.get_pixmap(dpi=dpi)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    return pytesseract.image_to_string(image)
+
+def pdf_page_count(path, page_limit=0):
+    doc = _open_pdf(path)
+    try:
+        return min(doc.page_count, page_limit) if page_limit else doc.page_count
+    finally:
+        doc.close()
+
+def iter_pdf_pages(path, page_limit=0, ocr=True):
+    doc = _open_pdf(path)
+    try:
+        for index, page in enumerate(doc):
+            if page_limit and index >= page_limit:
+                break
+            text = page.get_text()
+            if ocr and _is_scanned(page, text):
+                try:
+                    text = _ocr_page(page) or text
+                except Exception:
+                    pass  # No tesseract here; keep whatever text the page had
+            yield text
+    finally:
+        doc.close()
+
+def extract_pdf_range(path, first, last):
+    """Text of pages [first, last) plus the indexes of image-only pages that still need OCR."""
+    doc = _open_pdf(path)
+    try:
+        texts = []
+        scanned = []
+        for index in range(first, last):
+            page = doc[index]
+            text = page.get_text()
+            if _is_scanned(page, text):
+                scanned.append(index)
+            texts.append(text)
+        return texts, scanned
+    finally:
+        doc.close()
+
+def ocr_pdf_page(path, index, dpi=PDF_OCR_DPI):
+    doc = _open_pdf(path)
+    try:
+        return _ocr_page(doc[index], dpi)
+    finally:
+        doc.close()
+
+def read_pdf_pages(path, pool=None, page_limit=0, ocr=True, range_pages=PDF_RANGE_PAGES):
+    """Page texts of a PDF in order. With a pool, page ranges and OCR of image-only pages run as
+    separate tasks on it and are put back together here; without one the pages are read serially."""
+    if pool is None:
+        return list(iter_pdf_pages(path, page_limit, ocr))
+    count = pdf_page_count(path, page_limit)
+    ranges = [pool.submit(extract_pdf_range, path, first, min(count, first + range_pages))
+              for first in range(0, count, range_pages)]
+    pages = []
+    scanned = {}
+    try:
+        for future in ranges:
+            texts, blank = future.result()
+            if ocr:
+                # Queue OCR as soon as a range comes back so it overlaps the remaining extraction
+                scanned.update((index, pool.submit(ocr_pdf_page, path, index)) for index in blank)
+            pages.extend(texts)
+    except BaseException:
+        for future in ranges + list(scanned.values()):
+            future.cancel()
+        raise
+    for index, future in scanned.items():
+        try:
+            text = future.result()
+        except Exception:
+            continue  # No tesseract here; keep whatever text the page had
+        if text.strip():
+            pages[index] = text
+    return pages
+
+def iter_srt_pairs(path):
+    def blocks():
+        buffer = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line == "":
+                    if buffer:
+                        yield " ".join(buffer)
+                        buffer = []
+                elif not line.isdigit() and "-->" not in line:
+                    buffer.append(line)
+        if buffer:
+            yield " ".join(buffer)
+
+    for block in blocks():
+        if ":" in block:
+            speaker, _, line = block.partition(":")
+            speaker = speaker.strip()
+            line = line.strip()
+            if speaker and line and len(speaker) < 40:
+                yield speaker, line
+
+def iter_docx_paragraphs(path):
+    for para in Document(path).paragraphs:
+        yield para.text + "\n"
+
+def iter_document(path, ext, page_limit=0):
+    """(chunks, tools, source_type) for a non-media source; chunks is a lazy generator of text."""
+    if ext in [".doc", ".docx"]:
+        return iter_docx_paragraphs(path), ["doc_reader"], "document"
+    if ext == ".pdf":
+        return iter_pdf_pages(path, page_limit), ["pdf_reader"], "document"
+    if ext == ".srt":
+        return (f"{speaker}: {line}\n" for speaker, line in iter_srt_pairs(path)), ["subtitle_reader"], "subtitle"
+    if ext in READABLE_EXTENSIONS:
+        return iter_text(path), ["text_reader"], "text"
+    return (chunk for chunk in ()), [], "unknown"
+
+_NON_SPACE = re.compile(rb"\S")
+_ASCII_SPACE = None
+
+def _count_words(data):
+    """len(data.split()) without building the list; vectorised when numpy is available."""
+    global _ASCII_SPACE
+    try:
+        import numpy as np
+    except ImportError:
+        return len(data.split())
+    if not data:
+        return 0
+    if _ASCII_SPACE is None:
+        _ASCII_SPACE = np.zeros(256, dtype=bool)
+        _ASCII_SPACE[list(b" \t\n\r\x0b\x0c")] = True
+    space = _ASCII_SPACE[np.frombuffer(data, dtype=np.uint8)]
+    # A word starts wherever a non-space byte follows a space (or opens the data)
+    return int(np.count_nonzero(space[:-1] & ~space[1:])) + (0 if space[0] else 1)
+
+def _marked_lines(chunk):
+    # Yields the decoded lines of chunk that hold ':' or '?', jumping between hits with find()
+    n = len(chunk)
+    i = 0
+    colon = chunk.find(b":")
+    question = chunk.find(b"?")
+    while True:
+        if 0 <= colon < i:
+            colon = chunk.find(b":", i)
+        if 0 <= question < i:
+            question = chunk.find(b"?", i)
+        if colon == -1 and question == -1:
+            return
+        hit = question if colon == -1 or 0 <= question < colon else colon
+        line_end = chunk.find(b"\n", hit)
+        if line_end == -1:
+            line_end = n
+        yield chunk[chunk.rfind(b"\n", 0, hit) + 1:line_end].rstrip(b"\r").decode("utf-8", "replace")
+        i = line_end + 1
+
+def read_text_mmap(path, ext, max_bytes=DOCUMENT_MAX_MB * 1024 ** 2, block=1 << 22):
+    """read_document for large plain-text files, working on the mapped bytes.
+
+    Only the preview, the first line and lines holding ':' or '?' are decoded. Words and line
+    breaks are counted on ASCII whitespace and \\n, so exotic Unicode separators count as text.
+    A bare \\r, which the streamed reader treats as a line break, raises ValueError.
+    """
+    result = {"path": path, "ext": ext, "tools": ["text_reader"], "source_type": "text",
+              "pairs": [], "questions": [], "truncated": False}
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        length = min(size, max_bytes)
+        if not length:
+            return dict(result, content="", summary="No readable content found.")
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+            preview = mm[:PREVIEW_CHARS * 4].decode("utf-8", "replace")
+            result["content"] = preview.replace("\r\n", "\n").replace("\r", "\n")[:PREVIEW_CHARS]
+            result["truncated"] = size > length
+            first = _NON_SPACE.search(mm)
+            if first is None:
+                result["summary"] = "0 words across 0 lines. Preview: No preview available."
+                return result
+            start = first.start()
+            end = length
+            while mm[end - 1] in b" \t\r\n\x0b\x0c":
+                end -= 1
+
+            pairs = result["pairs"]
+            questions = result["questions"]
+            words = 0
+            lines = 1
+            pos = mm.rfind(b"\n", 0, start) + 1
+            while pos < end:
+                stop = min(end, pos + block)
+                if stop < end:
+                    # Blocks end on a line break so no word is split between two of them
+                    newline = mm.find(b"\n", stop, end)
+                    stop = end if newline == -1 else newline + 1
+                chunk = mm[pos:stop]
+                if chunk.count(b"\r") != chunk.count(b"\r\n"):
+                    raise ValueError("bare carriage returns")
+                words += _count_words(chunk)
+                lines += chunk.count(b"\n")
+                for line in _marked_lines(chunk):
+                    if ":" in line:
+                        input_text, _, output_text = line.partition(":")
+                        input_text = input_text.strip()
+                        output_text = output_text.strip()
+                        if input_text and output_text:
+                            pairs.append((input_text, output_text))
+                    if "?" in line and len(line) < 200:
+                        questions.append(line.strip())
+                pos = stop
+
+            line_end = mm.find(b"\n", start, end)
+            first_line = mm[start:end if line_end == -1 else line_end].rstrip(b"\r")
+            first_line = first_line[:80 * 4].decode("utf-8", "replace")
+            if lines == 1:
+                first_line = first_line.rstrip()
+            result["summary"] = f"{words} words across {lines} lines. Preview: {first_line[:80]}"
+    return result
+
+def _mmap_pays_off(path):
+    # bench_readers at 256 KB-64 MB: with numpy, mmap runs ~2x the streamed speed on prose, ~1.4x
+    # with a fifth of the lines marked and slower beyond; without numpy it never wins
+    if os.path.getsize(path) < MMAP_MIN_KB * 1024 or importlib.util.find_spec("numpy") is None:
+        return False
+    with open(path, "rb") as f:
+        sample = f.read(1 << 16)
+    if sample.count(b"\r") != sample.count(b"\r\n"):
+        return False
+    return sum(1 for _ in _marked_lines(sample)) < MMAP_MAX_MARKED * max(1, sample.count(b"\n"))
+
+def read_document(path, ext, max_bytes=DOCUMENT_MAX_MB * 1024 ** 2, page_limit=0):
+    # Runs in the ingest process pool. Reading and analysis share one streaming pass, so only the
+    # preview, pairs and questions come back; the cap is counted in decoded characters
+    if ext in PLAIN_TEXT_EXTENSIONS:
+        try:
+            if _mmap_pays_off(path):
+                return read_text_mmap(path, ext, max_bytes)
+        except (OSError, ValueError):
+            pass  # Not mappable (special file, odd filesystem, bare \r line breaks); stream it instead
+    chunks, tools, source_type = iter_document(path, ext, page_limit)
+    return _read_chunks(path, ext, chunks, tools, source_type, max_bytes)
+
+def analyze_pages(path, ext, pages, max_bytes=DOCUMENT_MAX_MB * 1024 ** 2):
+    # read_document for page texts that were already extracted, e.g. by read_pdf_pages
+    return _read_chunks(path, ext, (page for page in pages), ["pdf_reader"], "document", max_bytes)
+
+def _read_chunks(path, ext, chunks, tools, source_type, max_bytes):
+    doc = DocumentAccumulator(max_chars=max_bytes)
+    result = {"path": path, "ext": ext, "tools": tools, "source_type": source_type}
+    try:
+        for chunk in chunks:
+            if not doc.feed(chunk):
+                break
+    except Exception as e:
+        result["warning"] = f"Failed to read {source_type}: {e}"
+    finally:
+        chunks.close()
+    doc.close()
+    result.update(content=doc.preview, summary=doc.summary, pairs=doc.pairs, questions=doc.questions,
+                  truncated=doc.truncated)
+    return result
+
+def file_digest(path, size=None, chunk=1 << 20):
+    size = os.path.getsize(path) if size is None else size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        if size <= CATALOG_FULL_HASH_MB * (1 << 20):
+            for block in iter(lambda: f.read(chunk), b""):
+                digest.update(block)
+        else:
+            # Large files are sampled at head, middle and tail to keep rescans cheap
+            for offset in (0, size // 2, size - chunk):
+                f.seek(offset)
+                digest.update(f.read(chunk))
+    return digest.hexdigest()
+
+def confirm_duplicate(path, size, original):
+    # A sampled digest only says the file probably did not change; two different large files can
+    # share it, so they count as duplicates only if their bytes match
+    if not original or original == path or size <= CATALOG_FULL_HASH_MB * (1 << 20):
+        return original
+    try:
+        return original if filecmp.cmp(path, original, shallow=False) else None
+    except OSError:
+        return None
+
+def cpu_load():
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None)
+    except ImportError:
+        pass
+    if hasattr(os, "getloadavg"):
+        return os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+    return None
+
+class IngestThrottle:
+    def __init__(self, max_mb_per_sec=INGEST_MAX_MBPS, max_cpu_percent=INGEST_MAX_CPU):
+        self.rate = max_mb_per_sec * 1024 ** 2 if max_mb_per_sec else None
+        self.max_cpu = max_cpu_percent
+        self._allowance = self.rate or 0
+        self._last = time.monotonic()
+
+    def wait(self, nbytes):
+        if self.rate:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= nbytes
+            if self._allowance < 0:
+                time.sleep(-self._allowance / self.rate)
+        while self.max_cpu and (cpu_load() or 0) > self.max_cpu:
+            time.sleep(0.5)
+
+class IngestPipeline:
+    def __init__(self, bot, readers=INGEST_READERS, workers=INGEST_WORKERS, batch_size=INGEST_BATCH, throttle=None,
+                 hash_content=True, max_bytes=DOCUMENT_MAX_MB * 1024 ** 2, pdf_page_limit=PDF_PAGE_LIMIT,
+                 keep_workers=False):
+        self.bot = bot
+        self.log = bot.log
+        self.readers = readers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.throttle = throttle or IngestThrottle()
+        self.hash_content = hash_content
+        self.max_bytes = max_bytes
+        self.pdf_page_limit = pdf_page_limit
+        # A long-lived pipeline keeps its worker pool between runs until close()
+        self.keep_workers = keep_workers
+        self.reflected = 0
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._inflight = set()
+        self._workers = None
+        self._restarts = 0
+        self._checkpoint = None
+        self._last_checkpoint = time.monotonic()
+
+    def _open_workers(self):
+        try:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        except (OSError, NotImplementedError, ImportError) as e:
+            self.log(f"⚠️ Process pool unavailable ({e}); analysing in threads.")
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-cpu")
+
+    def _restart_workers(self, broken):
+        # A worker that dies (native crash, OOM killer) breaks the whole process pool for good
+        with self._lock:
+            if self._workers is broken:
+                if self._restarts >= INGEST_POOL_RESTARTS:
+                    raise RuntimeError("Worker pool keeps crashing; skipping the remaining files")
+                self._restarts += 1
+                self.log(f"⚠️ An ingest worker died; restarting the pool ({self._restarts}/{INGEST_POOL_RESTARTS}).")
+                broken.shutdown(wait=False)
+                self._workers = self._open_workers()
+            return self._workers
+
+    def _submit(self, fn, *args):
+        workers = self._workers
+        try:
+            return workers.submit(fn, *args)
+        except BrokenProcessPool:
+            return self._restart_workers(workers).submit(fn, *args)
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, None
+        if workers:
+            workers.shutdown(wait=True)
+
+    def run(self, paths, skip=None, checkpoint=None):
+        self._checkpoint = checkpoint
+        self.reflected = 0
+        self.processed = 0
+        self._pending = {}
+        results = queue.Queue()
+        capacity = max(1, (self.readers + self.workers) * 4)
+        slots = threading.Semaphore(capacity)
+        readers = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="ingest-read")
+        if self._workers is None:
+            self._workers = self._open_workers()
+        self._restarts = 0
+
+        def publish(base, future):
+            result = dict(base)
+            try:
+                result.update(future.result())
+            except Exception as e:
+                result.update(content=None, error=str(e))
+            results.put(result)
+
+        def fan_out(fn, error):
+            # Media and long PDFs use the pool themselves; a crash there also replaces the pool
+            workers = self._workers
+            try:
+                return fn(workers)
+            except BrokenProcessPool as e:
+                self._restart_workers(workers)
+                raise RuntimeError(f"{error}: {e}") from e
+            except Exception as e:
+                raise RuntimeError(f"{error}: {e}") from e
+
+        def dispatch(base, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                results.put(dict(base, content=None, error=str(e)))
+                return
+            if not result.get("deferred"):
+                route(result)
+
+        def retry(result):
+            # The original of a deferred duplicate failed; this copy is read in its place
+            try:
+                readers.submit(route, result)
+            except Exception as e:
+                results.put(dict(result, content=None, error=str(e)))
+
+        def route(result):
+            # Every path must end with exactly one queued result, or its slot is never released
+            try:
+                if result.get("duplicate_of"):
+                    results.put(result)
+                    return
+                if result["ext"] in MEDIA_EXTENSIONS:
+                    # Chunks fan out to the worker pool; this reader waits for them, which paces the scan
+                    content = fan_out(lambda pool: self.bot.transcriber.transcribe(
+                        result["path"], pool, result.get("digest")), "Failed to transcribe audio")
+                    tools, source_type = media_source(result["ext"])
+                    submitted = self._submit(analyze_source, result["path"], result["ext"], content, tools,
+                                             source_type)
+                elif result["ext"] == ".pdf" and self._is_long_pdf(result["path"]):
+                    pages = fan_out(lambda pool: read_pdf_pages(result["path"], pool, self.pdf_page_limit),
+                                    "Failed to read document")
+                    submitted = self._submit(analyze_pages, result["path"], result["ext"], pages, self.max_bytes)
+                else:
+                    submitted = self._submit(read_document, result["path"], result["ext"], self.max_bytes,
+                                             self.pdf_page_limit)
+            except Exception as e:
+                results.put(dict(result, content=None, error=str(e)))
+                return
+            submitted.add_done_callback(lambda f: publish(result, f))
+
+        writer = threading.Thread(target=self._write_loop, args=(results, slots, retry), daemon=True)
+        writer.start()
+        try:
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if skip and skip(path, st):
+                    continue
+                self.bot.wait_for_shortterm_room()
+                self.throttle.wait(st.st_size)
+                slots.acquire()
+                base = {"path": path, "ext": os.path.splitext(path)[1].lower(),
+                        "mtime": st.st_mtime, "size": st.st_size}
+                with self._lock:
+                    self._inflight.add(path)
+                try:
+                    readers.submit(self._prepare, base).add_done_callback(lambda f, b=base: dispatch(b, f))
+                except Exception as e:
+                    results.put(dict(base, content=None, error=str(e)))
+        finally:
+            # Holding every slot means every path's result has reached the writer; a kept pool
+            # cannot be shut down to wait for them, and readers must stay open for retried duplicates
+            for _ in range(capacity):
+                slots.acquire()
+            readers.shutdown(wait=True)
+            if not self.keep_workers:
+                self.close()
+            results.put(None)
+            writer.join()
+        return self.reflected
+
+    def _is_long_pdf(self, path):
+        # Splitting only pays off with several workers and enough pages to keep them busy
+        if self.workers < 2:
+            return False
+        try:
+            return pdf_page_count(path, self.pdf_page_limit) > PDF_PARALLEL_PAGES
+        except Exception:
+            return False  # read_document reports the broken file
+
+    def _prepare(self, base):
+        result = dict(base)
+        if self.hash_content:
+            result["digest"] = file_digest(base["path"], base["size"])
+            original = confirm_duplicate(base["path"], base["size"], self.bot.find_duplicate(result["digest"]))
+            if original:
+                result["duplicate_of"] = original
+                return result
+            with self._lock:
+                entry = self._pending.get(result["digest"])
+                checked = entry["path"] if entry else None
+            if checked and not confirm_duplicate(base["path"], base["size"], checked):
+                return result  # Only the samples match; read it on its own
+            # Same content earlier in this run: wait until that file is committed before calling this a duplicate
+            with self._lock:
+                entry = self._pending.get(result["digest"])
+                if entry and entry["path"] != checked:
+                    pass  # The original changed while we compared; read this one on its own
+                elif entry:
+                    entry["waiting"].append(result)
+                    result["deferred"] = True
+                else:
+                    self._pending[result["digest"]] = {"path": base["path"], "waiting": []}
+        return result
+
+    def _settle(self, batch, results, retry):
+        for result in batch:
+            digest = result.get("digest")
+            if not digest or result.get("duplicate_of"):
+                continue
+            with self._lock:
+                entry = self._pending.get(digest)
+                if not entry or entry["path"] != result["path"]:
+                    continue
+                if result.get("error") and entry["waiting"]:
+                    following = entry["waiting"].pop(0)
+                    following.pop("deferred")
+                    entry["path"] = following["path"]
+                    waiting = []
+                else:
+                    following = None
+                    waiting = self._pending.pop(digest)["waiting"]
+            if following:
+                retry(following)
+            for duplicate in waiting:
+                duplicate.pop("deferred", None)
+                results.put(dict(duplicate, duplicate_of=result["path"]))
+
+    def _write_loop(self, results, slots, retry):
+        batch = []
+        while True:
+            try:
+                item = results.get(timeout=1.0)
+            except queue.Empty:
+                item = False
+            if item:
+                batch.append(item)
+                slots.release()
+            if batch and (item is None or item is False or len(batch) >= self.batch_size):
+                self.reflected += self.bot._commit_results(batch)
+                self._settle(batch, results, retry)
+                self.processed += len(batch)
+                with self._lock:
+                    self._inflight.difference_update(result["path"] for result in batch)
+                batch = []
+                self._maybe_checkpoint()
+            if item is None:
+                return
+
+    def _maybe_checkpoint(self):
+        if not self._checkpoint or time.monotonic() - self._last_checkpoint < CHECKPOINT_INTERVAL:
+            return
+        with self._lock:
+            pending = sorted(self._inflight)
+        try:
+            self._checkpoint(self.processed, pending)
+        except Exception as e:
+            self.log(f"⚠️ Scan checkpoint failed: {e}")
+        self._last_checkpoint = time.monotonic()
+
+class ScanPolicy:
+    def __init__(self, include=None, exclude=None, max_depth=None, max_file_mb=None,
+                 skip_hidden=True, skip_system=True, skip_dirs=SCAN_SKIP_DIRS, priorities=None,
+                 extensions=SCAN_EXTENSIONS):
+        self.include = [self._norm(p) for p in include or []]
+        self.exclude = [self._norm(p) for p in exclude or []]
+        self.max_depth = max_depth
+        self.max_bytes = max_file_mb * 1024 ** 2 if max_file_mb else None
+        self.skip_hidden = skip_hidden
+        self.skip_system = skip_system
+        self.skip_dirs = frozenset(d.lower() for d in skip_dirs)
+        self.priorities = {self._norm(root): p for root, p in (priorities or {}).items()}
+        self.extensions = frozenset(extensions)
+        self.reset_report()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    @staticmethod
+    def _norm(path):
+        return str(path).replace("\\", "/").lower()
+
+    def reset_report(self):
+        self.report = {"dirs_pruned": 0, "files_pruned": 0, "files_matched": 0}
+
+    def order_roots(self, roots):
+        return sorted(roots, key=lambda root: -self.priorities.get(self._norm(root), 0))
+
+    def _hidden(self, entry):
+        if self.skip_hidden and entry.name.startswith("."):
+            return True
+        if os.name != "nt" or not (self.skip_hidden or self.skip_system):
+            return False  # Attribute bits exist only on Windows, where scandir already cached the stat
+        attributes = entry.stat(follow_symlinks=False).st_file_attributes
+        if self.skip_hidden and attributes & getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0):
+            return True
+        return bool(self.skip_system and attributes & getattr(stat, "FILE_ATTRIBUTE_SYSTEM", 0))
+
+    def _excluded(self, path):
+        norm = self._norm(path)
+        return any(fnmatch.fnmatch(norm, pattern) for pattern in self.exclude)
+
+    def allow_dir(self, entry, depth):
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if entry.name.lower() in self.skip_dirs or self._hidden(entry) or self._excluded(entry.path):
+            self.report["dirs_pruned"] += 1
+            return False
+        return True
+
+    def allow_path(self, path):
+        parts = Path(path).parts[:-1]
+        for part in parts[1:]:
+            if part.lower() in self.skip_dirs or (self.skip_hidden and part.startswith(".")):
+                return False
+        if os.path.splitext(path)[1].lower() not in self.extensions or self._excluded(path):
+            return False
+        if self.include and not any(fnmatch.fnmatch(self._norm(path), p) for p in self.include):
+            return False
+        try:
+            return not (self.max_bytes and os.path.getsize(path) > self.max_bytes)
+        except OSError:
+            return False
+
+    def allow_file(self, entry):
+        if os.path.splitext(entry.name)[1].lower() not in self.extensions:
+            return False
+        if self._hidden(entry) or self._excluded(entry.path):
+            self.report["files_pruned"] += 1
+            return False
+        if self.include and not any(fnmatch.fnmatch(self._norm(entry.path), p) for p in self.include):
+            self.report["files_pruned"] += 1
+            return False
+        if self.max_bytes and entry.stat().st_size > self.max_bytes:
+            self.report["files_pruned"] += 1
+            return False
+        self.report["files_matched"] += 1
+        return True
+
+class ScanCursor:
+    def __init__(self, roots, state=None):
+        state = state or {}
+        self.roots = list(state.get("roots", roots))
+        self.stack = [tuple(item) for item in state.get("stack", [])]
+        self.current = None
+
+    def state(self):
+        # The directory being listed goes back on the stack; its finished files are skipped via the catalog
+        stack = list(self.stack)
+        if self.current:
+            stack.append(self.current)
+        return {"roots": list(self.roots), "stack": [list(item) for item in stack]}
+
+class FileWatcher:
+    def __init__(self, bot, roots, debounce=WATCH_DEBOUNCE):
+        self.bot = bot
+        self.roots = roots
+        self.debounce = debounce
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._observer = None
+        self._pipeline = None
+        self._running = False
+
+    def start(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.dest_path)
+
+        observer = Observer()
+        handler = Handler()
+        for root in self.roots:
+            try:
+                observer.schedule(handler, root, recursive=True)
+            except OSError as e:
+                self.bot.log(f"⚠️ Cannot watch {root}: {e}")
+        observer.start()
+        self._observer = observer
+        self._running = True
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        return True
+
+    def stop(self):
+        self._running = False
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        if self._pipeline:
+            self._pipeline.close()
+
+    def notify(self, path):
+        if not self.bot.scan_policy.allow_path(path):
+            return
+        # Rapid repeated writes only push the deadline back
+        with self._lock:
+            self._pending[path] = time.monotonic()
+
+    def _flush_loop(self):
+        while self._running:
+            time.sleep(self.debounce / 2)
+            if self.bot._is_training:
+                continue
+            now = time.monotonic()
+            with self._lock:
+                ready = [path for path, stamp in self._pending.items() if now - stamp >= self.debounce]
+                for path in ready:
+                    del self._pending[path]
+            if not ready:
+                continue
+            try:
+                # Debounced batches are small and frequent; one pipeline keeps its worker pool warm for all of them
+                if self._pipeline is None:
+                    self._pipeline = self.bot.ingest_pipeline(keep_workers=True)
+                reflected = self.bot.ingest((path for path in ready if os.path.isfile(path)), pipeline=self._pipeline)
+                self.bot.log(f"👁️ {len(ready)} changed files settled; {reflected} reflected.")
+            except Exception as e:
+                self.bot.log(f"⚠️ File watcher error: {e}")
+
+class BrainBot:
+    def __init__(self, base_path="G:/brainbot/core", log=None, chat=None, tools=None, fuzzy_top_k=FUZZY_TOP_K,
+                 storage=MEMORY_BACKEND, ingest_readers=INGEST_READERS, ingest_workers=INGEST_WORKERS,
+                 scan_policy=None, tagger=None, transcriber=None):
+        self.base = Path(base_path)
+        self.log = log or (lambda msg: print(msg))
+        self.chat = chat or (lambda msg: None)
+        self.tools = tools
+        self.fuzzy_top_k = fuzzy_top_k
+        self.ingest_readers = ingest_readers
+        self.ingest_workers = ingest_workers
+        self.ingest_throttle = IngestThrottle()
+        self.hash_content = True
+        self.document_max_bytes = DOCUMENT_MAX_MB * 1024 ** 2
+        self.pdf_page_limit = PDF_PAGE_LIMIT
+        self.scan_policy = scan_policy or self._load_scan_policy()
+        self.tagger = tagger or self._load_tagger()
+        self.transcriber = transcriber or Transcriber(open_transcription_backend(TRANSCRIBE_BACKEND, self.base),
+                                                      cache_dir=self.base / "memory" / "transcripts")
+        self.store = open_memory_store(storage, self.base, log=self.log)
+
         self._last_spoke = datetime.utcnow()
         self._craving_enabled = False
         self._autonomous_senses_enabled = False
-        self._seen = self._load_seen_paths()
         self._is_training = False
-
-    def startup(self, scan_on_load=False, enable_craving=False, use_senses=False):
+        self._watcher = None
+        self._dream_lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._ingest_open = threading.Event()
+        self._ingest_open.set()
+        self.memory_index = MemoryIndex(key=lambda text: self._synonym_map(self._normalize_question(text)),
+                                        previews=not self.store.supports_search)
+
+    def startup(self, scan_on_load=False, enable_craving=False, use_senses=False, watch_files=True, auto_dream=True):
         self.log("🧠 BrainBot awakening...")
-        self._seen = self._load_seen_paths()
+        self.migrate_memory()
+        self._ensure_memory_index()
+        if auto_dream:
+            self.enable_dream_scheduler()
         if enable_craving:
             self.enable_craving(use_senses=use_senses)
-        self.enable_idle_scan(paths=["C:/", "G:/"], interval=300)
-        if scan_on_load:
-            threading.Thread(target=self._initial_scan, daemon=True).start()
+        running = set()
+        if watch_files and self.enable_watch(paths=["C:/", "G:/"]):
+            if scan_on_load:
+                # One catch-up pass for changes made while we were closed, then events only
+                threading.Thread(target=self._initial_scan, args=(["C:/", "G:/"],), daemon=True).start()
+                running.add("initial")
+        else:
+            self.enable_idle_scan(paths=["C:/", "G:/"], interval=300)
+            running.add("idle")
+            if scan_on_load:
+                threading.Thread(target=self._initial_scan, daemon=True).start()
+                running.add("initial")
+        self._resume_scans(running)
         self.begin_recursive_inquiry()
 
     def begin_recursive_inquiry(self):
         try:
-            if self.last_inquiry_path.exists():
-                with open(self.last_inquiry_path, "r", encoding="utf-8") as f:
-                    last_data = json.load(f)
-                    current = last_data.get("last_question", "what is 0").strip()
-            else:
-                current = "what is 0?"
+            current = (self.store.get_last_inquiry() or "what is 0?").strip()
 
-            if not self.answered_path.exists():
+            answers = list(self.store.iter_answered())
+            if not answers:
                 self.log("⚠️ No permanent memory found.")
                 return
 
-            with open(self.answered_path, "r", encoding="utf-8") as f:
-                answers = json.load(f)
-
             visited = set()
             while current and current not in visited:
                 visited.add(current)
                 self.log(f"🔍 BrainBot asks: {current}")
-                with open(self.last_inquiry_path, "w", encoding="utf-8") as f:
-                    json.dump({"last_question": current}, f, indent=2)
+                self.store.set_last_inquiry(current)
 
                 norm_current = self._normalize_question(current)
                 mapped_current = self._synonym_map(norm_current)
@@ -97,116 +2449,140 @@ class BrainBot:
 
     def store_reflection(self, role, content, glyph="🔍", thoughts="", source_path=None,
                          extension=".txt", source_type="text", memory_tag="scan",
-                         invoked_tools=None, training_pairs=None, questions=None):
+                         invoked_tools=None, training_pairs=None, questions=None, digest=None, summary=None):
+        reflection = self.build_reflection(role, content, glyph=glyph, thoughts=thoughts, source_path=source_path,
+                                           extension=extension, source_type=source_type, memory_tag=memory_tag,
+                                           invoked_tools=invoked_tools, training_pairs=training_pairs,
+                                           questions=questions, digest=digest, summary=summary)
+        try:
+            name = self.store.put_reflection(reflection)
+            self.log(f"🧠 Stored shortterm reflection: {name}")
+        except Exception as e:
+            self.log(f"⚠️ Failed to store reflection: {e}")
+
+    def build_reflection(self, role, content, glyph="🔍", thoughts="", source_path=None,
+                         extension=".txt", source_type="text", memory_tag="scan",
+                         invoked_tools=None, training_pairs=None, questions=None, digest=None,
+                         summary=None, tag=True):
+        path = source_path or f"{role}_{datetime.utcnow().isoformat()}"
+        summary = summary or self.analyze_content(content)
         reflection = {
-            "path": source_path or f"{role}_{datetime.utcnow().isoformat()}",
+            "id": reflection_id(path, digest=digest, content=content),
+            "path": path,
             "timestamp": datetime.utcnow().isoformat(),
             "extension": extension,
             "source_type": source_type,
-            "summary": self.analyze_content(content),
+            "summary": summary,
             "glyph": glyph,
-            "thoughts": thoughts or self.analyze_content(content),
-            "preview": content[:1000] if content else "Unreadable or binary",
+            "thoughts": thoughts or summary,
+            "preview": content[:PREVIEW_CHARS] if content else "Unreadable or binary",
             "trained": bool(training_pairs),
             "training_pairs": training_pairs if training_pairs else [],
             "questions_generated": len(questions) if questions else 0,
             "invoked_tools": invoked_tools or [],
             "memory_tag": memory_tag
         }
+        if tag:
+            self.tagger.apply([reflection])
+        return reflection
 
-        preview = reflection["preview"].lower()
-
-        emotion_map = {
-            "love": "❤️", "hate": "💢", "sad": "😢", "cry": "😭",
-            "angry": "😠", "happy": "😊", "fear": "😨", "laugh": "😂"
-        }
-        for keyword, glyph in emotion_map.items():
-            if keyword in preview:
-                reflection["emotion"] = glyph
-                break
-
-        mood_map = {"truth": "🧠", "error": "⚠️", "purpose": "🌱"}
-        for keyword, mood_glyph in mood_map.items():
-            if keyword in preview:
-                reflection["mood"] = mood_glyph
-                break
+    def dream(self, batch_size=DREAM_BATCH):
+        if not self._dream_lock.acquire(blocking=False):
+            self.log("🌌 A dream is already in progress.")
+            return
+        try:
+            # Training writes its reflections into short-term memory; let it finish first
+            if self._is_training:
+                self.log("⏳ Training in progress; dream deferred.")
+                return
+            self._consolidate(batch_size)
+        finally:
+            self._dream_lock.release()
 
-        filename = f"reflection_{hash(reflection['path'])}.json"
-        path = self.short_term_dir / filename
+    def _consolidate(self, batch_size):
+        self.log("🌌 Dream ritual initiated...")
+        dream_tag = f"dream_{datetime.utcnow().strftime('%Y%m%d_%H%M')}"
+        glyph_counts = {}
+        emotion_counts = {}
+        dreamed = 0
+        stored_total = 0
+        started = time.time()
 
+        batches = self.store.drain_shortterm_batches(batch_size)
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(reflection, f, indent=2)
-            self.log(f"🧠 Stored shortterm reflection: {filename}")
+            for reflections in batches:
+                batch_started = time.time()
+                reflections.sort(key=lambda r: r.get("timestamp", ""))
+                pairs = []
+                for r in reflections:
+                    r["memory_tag"] = dream_tag
+                    glyph = r.get("glyph", "🔍")
+                    glyph_counts[glyph] = glyph_counts.get(glyph, 0) + 1
+                    emotion = r.get("emotion")
+                    if emotion:
+                        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
+                    if isinstance(r.get("training_pairs"), list):
+                        pairs.extend(r["training_pairs"])
+
+                # Persist before the short-term copies are released by advancing the drain
+                stored = self.store.append_longterm(reflections)
+                self.train_on_pairs(pairs)
+                self.memory_index.add_reflections(stored)
+                analysis = analyze_documents([r.get("preview", "") for r in stored])
+                self.append_questions(analysis.all_questions())
+
+                dreamed += len(reflections)
+                stored_total += len(stored)
+                elapsed = max(time.time() - batch_started, 1e-6)
+                self.log(f"📦 Dream batch: {len(reflections)} reflections ({len(stored)} new, "
+                         f"{analysis.total_words()} words) in {elapsed:.2f}s — {len(reflections) / elapsed:.0f}/s")
         except Exception as e:
-            self.log(f"⚠️ Failed to store reflection: {e}")
-
-    def dream(self):
-        self.log("🌌 Dream ritual initiated...")
-        reflections = []
-        for file in self.short_term_dir.glob("reflection_*.json"):
-            try:
-                with open(file, "r", encoding="utf-8") as f:
-                    reflection = json.load(f)
-                reflections.append(reflection)
-                file.unlink()
-                self.log(f"🗑️ Deleted shortterm file: {file.name}")
-            except Exception as e:
-                self.log(f"⚠️ Failed to process {file.name}: {e}")
+            self.log(f"⚠️ Dream interrupted after {dreamed} reflections; the rest stay in short-term memory: {e}")
+        finally:
+            batches.close()
 
-        if not reflections:
+        if not dreamed:
             self.log("🌿 No new reflections added.")
             return
 
-        reflections.sort(key=lambda r: r.get("timestamp", ""))
-        dream_tag = f"dream_{datetime.utcnow().strftime('%Y%m%d_%H%M')}"
-        for r in reflections:
-            r["memory_tag"] = dream_tag
-
-        glyph_counts = {}
-        emotion_counts = {}
-        for r in reflections:
-            glyph = r.get("glyph", "🔍")
-            glyph_counts[glyph] = glyph_counts.get(glyph, 0) + 1
-            emotion = r.get("emotion")
-            if emotion:
-                emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-
         glyph_summary = ", ".join([f"{g}: {c}" for g, c in glyph_counts.items()])
         emotion_summary = ", ".join([f"{e}: {c}" for e, c in emotion_counts.items()])
         self.log(f"🌌 Dream glyphs: {glyph_summary}")
         self.log(f"💫 Dream emotions: {emotion_summary}")
-
-        all_pairs = []
-        for r in reflections:
-            pairs = r.get("training_pairs", [])
-            if isinstance(pairs, list):
-                all_pairs.extend(pairs)
-        self.train_on_pairs(all_pairs)
-
-        self.append_to_longterm(reflections)
-        self.append_questions([
-            q for r in reflections
-            for q in self.generate_questions(r.get("preview", ""), r.get("path", "unknown"))
-        ])
-        self.log(f"📦 Dream complete. {len(reflections)} reflections moved to long-term.")
+        elapsed = max(time.time() - started, 1e-6)
+        self.log(f"📦 Dream complete. {dreamed} reflections moved to long-term "
+                 f"({stored_total} new) in {elapsed:.1f}s — {dreamed / elapsed:.0f}/s.")
         self.partition_longterm()
 
     def reflect_file(self, path):
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            self.log(f"⚠️ Cannot stat {path}: {e}")
+            return
+        result = {"path": path, "ext": os.path.splitext(path)[1].lower(), "mtime": st.st_mtime, "size": st.st_size}
+        if self.hash_content:
+            result["digest"] = file_digest(path, st.st_size)
+            result["duplicate_of"] = confirm_duplicate(path, st.st_size, self.find_duplicate(result["digest"]))
+        if not result.get("duplicate_of"):
+            if result["ext"] in MEDIA_EXTENSIONS:
+                content, tools, source_type = self.read_source(path)
+                result.update(content=content, tools=tools, source_type=source_type)
+                if content:
+                    result.update(analyze_documents([content]).row(0))
+            else:
+                result.update(read_document(path, result["ext"], self.document_max_bytes, self.pdf_page_limit))
+        self._commit_results([result])
+
+    def read_source(self, path):
         ext = os.path.splitext(path)[1].lower()
         content = None
         tools = []
         source_type = "unknown"
 
-        if ext in VIDEO_EXTENSIONS:
-            audio_path = self.extract_audio_from_avi(path)
-            content = self.transcribe_audio(audio_path)
-            tools = ["ffmpeg", "transcription"]
-            source_type = "video"
-        elif ext in AUDIO_EXTENSIONS:
+        if ext in MEDIA_EXTENSIONS:
             content = self.transcribe_audio(path)
-            tools = ["transcription"]
-            source_type = "audio"
+            tools, source_type = media_source(ext)
         elif ext in [".doc", ".docx"]:
             content = self.read_docx(path)
             tools = ["doc_reader"]
@@ -224,41 +2600,136 @@ class BrainBot:
             tools = ["text_reader"]
             source_type = "text"
 
+        return content, tools, source_type
+
+    def ingest_pipeline(self, keep_workers=False):
+        return IngestPipeline(self, readers=self.ingest_readers, workers=self.ingest_workers,
+                              throttle=self.ingest_throttle, hash_content=self.hash_content,
+                              max_bytes=self.document_max_bytes, pdf_page_limit=self.pdf_page_limit,
+                              keep_workers=keep_workers)
+
+    def ingest(self, paths, checkpoint=None, pipeline=None):
+        pipeline = pipeline or self.ingest_pipeline()
+        return pipeline.run(paths, skip=self.is_seen, checkpoint=checkpoint)
+
+    def run_scan(self, roots, name="scan"):
+        try:
+            state = self.store.load_checkpoint(name)
+        except Exception as e:
+            self.log(f"⚠️ Failed to load scan checkpoint {name}: {e}")
+            state = None
+        cursor = ScanCursor(self.scan_policy.order_roots(roots), state)
+        done_before = state.get("processed", 0) if state else 0
+        pending = state.get("pending", []) if state else []
+        if state:
+            self.log(f"⏯️ Resuming {name} scan after {done_before} files ({len(pending)} pending).")
+
+        def paths():
+            yield from pending
+            yield from self.scan_files(roots, cursor=cursor)
+
+        def checkpoint(processed, inflight):
+            self.store.save_checkpoint(name, dict(cursor.state(), processed=done_before + processed,
+                                                  pending=inflight))
+
+        scanned = self.ingest(paths(), checkpoint=checkpoint)
+        try:
+            self.store.clear_checkpoint(name)
+        except Exception as e:
+            self.log(f"⚠️ Failed to clear scan checkpoint {name}: {e}")
+        return scanned
+
+    def _resume_scans(self, running):
+        try:
+            names = [name for name in self.store.list_checkpoints() if name not in running]
+        except Exception as e:
+            self.log(f"⚠️ Failed to list scan checkpoints: {e}")
+            return
+        for name in names:
+            state = self.store.load_checkpoint(name) or {}
+            roots = state.get("roots") or [item[0] for item in state.get("stack", [])[:1]]
+            threading.Thread(target=self.run_scan, args=(roots, name), daemon=True).start()
+
+    def _reflection_from_result(self, result, log_counts=True):
+        path = result["path"]
+        content = result.get("content")
         if not content:
             self.log(f"⚠️ No readable content from: {path}")
-            return
+            return None
 
-        summary = self.analyze_content(content)
-        pairs = self.extract_training_pairs(content)
-        questions = self.generate_questions(content, source=path)
+        pairs = result.get("pairs", [])
+        questions = result.get("questions", [])
+        if log_counts:
+            self.log(f"🔗 Extracted {len(pairs)} training pairs.")
+            self.log(f"❓ Generated {len(questions)} questions from {path}")
         self.train_on_pairs(pairs)
 
-        self.store_reflection(
+        return self.build_reflection(
             role="scan",
             content=content,
             glyph="🔍",
-            thoughts=summary,
+            thoughts=result.get("summary"),
+            summary=result.get("summary"),
             source_path=path,
-            extension=ext,
-            source_type=source_type,
+            extension=result["ext"],
+            source_type=result.get("source_type", "unknown"),
             memory_tag="idle",
-            invoked_tools=tools,
+            invoked_tools=result.get("tools", []),
             training_pairs=pairs,
-            questions=questions
+            questions=questions,
+            digest=result.get("digest"),
+            tag=False
         )
-        self._seen.add(path)
+
+    def _commit_results(self, results, log_counts=True):
+        self._last_activity = time.monotonic()
+        reflections = []
+        entries = []
+        for result in results:
+            path = result["path"]
+            if result.get("error"):
+                # Failed reads stay out of the catalog so the next scan retries them
+                self.log(f"⚠️ {result['error']} ({path})")
+                continue
+            if result.get("warning"):
+                self.log(f"⚠️ {result['warning']} ({path})")
+            if result.get("truncated"):
+                self.log(f"✂️ Analysed only the first {self.document_max_bytes // 1024 ** 2} MB of {path}")
+            original = result.get("duplicate_of")
+            digest = result.get("digest")
+            rid = reflection_id(path, digest) if digest else None
+            if original == path:
+                self.log(f"♻️ Content unchanged: {path}")
+            elif original:
+                self.log(f"♻️ Duplicate of {original}: {path}")
+            else:
+                reflection = self._reflection_from_result(result, log_counts=log_counts)
+                if reflection:
+                    reflections.append(reflection)
+                    rid = reflection["id"]
+            entries.append({"path": path, "mtime": result.get("mtime"), "size": result.get("size"),
+                            "digest": digest, "id": rid})
+        try:
+            if reflections:
+                self.tagger.apply(reflections)
+                self.store.put_reflections(reflections)
+                self.log(f"🧠 Stored {len(reflections)} shortterm reflections.")
+            self.store.catalog_put(entries)
+        except Exception as e:
+            self.log(f"⚠️ Failed to store reflections: {e}")
+            return 0
+        return len(reflections)
+
+    def find_duplicate(self, digest):
+        try:
+            return self.store.catalog_find_digest(digest)
+        except Exception as e:
+            self.log(f"⚠️ Catalog lookup failed: {e}")
+            return None
 
     def extract_training_pairs(self, content):
         try:
-            lines = content.strip().splitlines()
-            pairs = []
-            for line in lines:
-                if ":" in line:
-                    parts = line.split(":", 1)
-                    input_text = parts[0].strip()
-                    output_text = parts[1].strip()
-                    if input_text and output_text:
-                        pairs.append((input_text, output_text))
+            pairs = extract_pairs(content)
             self.log(f"🔗 Extracted {len(pairs)} training pairs.")
             return pairs
         except Exception as e:
@@ -280,32 +2751,11 @@ class BrainBot:
 
     def read_srt(self, path):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            dialogue_blocks = []
-            buffer = []
-            for line in lines:
-                line = line.strip()
-                if line == "":
-                    if buffer:
-                        dialogue_blocks.append(" ".join(buffer))
-                        buffer = []
-                elif not line.isdigit() and "-->" not in line:
-                    buffer.append(line)
-            if buffer:
-                dialogue_blocks.append(" ".join(buffer))
-
             pairs = []
             speaker_counts = {}
-            for block in dialogue_blocks:
-                if ":" in block:
-                    parts = block.split(":", 1)
-                    speaker = parts[0].strip()
-                    line = parts[1].strip()
-                    if speaker and line and len(speaker) < 40:
-                        pairs.append((speaker, line))
-                        speaker_counts[speaker] = speaker_counts.get(speaker, 0) + 1
+            for speaker, line in iter_srt_pairs(path):
+                pairs.append((speaker, line))
+                speaker_counts[speaker] = speaker_counts.get(speaker, 0) + 1
 
             self.log(f"🎬 Read SRT: {path} with {len(pairs)} speaker-line pairs.")
             self.log(f"🧙 Archetype map: " + ", ".join([f"{s}: {c}" for s, c in speaker_counts.items()]))
@@ -317,11 +2767,8 @@ class BrainBot:
 
     def transcribe_audio(self, path):
         try:
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(path) as source:
-                audio = recognizer.record(source)
-            transcript = recognizer.recognize_google(audio)
-            self.log(f"🎙️ Transcribed audio from {path}")
+            transcript = self.transcriber.transcribe(path)
+            self.log(f"🎙️ Transcribed audio from {path} ({self.transcriber.backend.name})")
             return transcript
         except Exception as e:
             self.log(f"⚠️ Failed to transcribe audio: {e}")
@@ -337,22 +2784,20 @@ class BrainBot:
             self.log(f"⚠️ Failed to read DOCX: {path} — {e}")
             return ""
 
-    def read_pdf(self, path):
+    def read_pdf(self, path, pool=None):
         try:
-            import fitz
-            doc = fitz.open(path)
-            if doc.page_count == 0:
-                raise ValueError("Empty or invalid PDF")
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
+            text = "".join(read_pdf_pages(path, pool, self.pdf_page_limit))
             self.log(f"📄 Read PDF: {path}")
             return text
         except Exception as e:
             self.log(f"⚠️ Failed to read PDF: {path} — {e}")
             return ""
 
+    def iter_source(self, path):
+        """Stream a document as text chunks (blocks, pages, paragraphs or subtitle lines)."""
+        chunks, _, _ = iter_document(path, os.path.splitext(path)[1].lower())
+        return chunks
+
     def read_file(self, path):
         try:
             with open(path, "r", encoding="utf-8", errors="replace") as f:
@@ -361,66 +2806,31 @@ class BrainBot:
             self.log(f"⚠️ Failed to read file: {path} — {e}")
             return ""
 
-    def extract_audio_from_avi(self, path):
-        try:
-            out_path = str(Path(path).with_suffix(".wav"))
-            cmd = [
-                "ffmpeg", "-y", "-i", path,
-                "-vn", "-acodec", "pcm_s16le",
-                "-ar", "16000", "-ac", "1", out_path
-            ]
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self.log(f"🎞️ Extracted audio to {out_path}")
-            return out_path
-        except Exception as e:
-            self.log(f"⚠️ Failed to extract audio: {e}")
-            return ""
-
     def analyze_content(self, content):
         try:
-            if not content:
-                return "No readable content found."
-            lines = content.strip().splitlines()
-            words = content.strip().split()
-            line_count = len(lines)
-            word_count = len(words)
-            preview = lines[0] if lines else "No preview available."
-            return f"{word_count} words across {line_count} lines. Preview: {preview[:80]}"
+            return analyze_text(content)
         except Exception as e:
             self.log(f"⚠️ Failed to analyze content: {e}")
             return "Analysis failed."
 
     def partition_longterm(self):
         try:
-            size_mb = os.path.getsize(self.long_term_path) / (1024 ** 2)
-            if size_mb <= MAX_LONGTERM_MB:
-                return
-            with open(self.long_term_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            chunk_size = 10000
-            for i in range(0, len(data), chunk_size):
-                chunk = data[i:i + chunk_size]
-                stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                outname = f"longterm_{stamp}_part{i//chunk_size + 1}.json"
-                outpath = self.long_term_path.parent / outname
-                with open(outpath, "w", encoding="utf-8") as f:
-                    json.dump(chunk, f, indent=2)
-                self.log(f"✂️ Created {outname} with {len(chunk)} entries.")
-            os.remove(self.long_term_path)
-            self.log("🗑️ Removed oversized longterm.json")
+            self.store.partition_longterm()
         except Exception as e:
             self.log(f"❌ partition_longterm failed: {e}")
 
-    def _initial_scan(self):
+    def iter_longterm(self):
+        return self.store.iter_longterm()
+
+    def migrate_memory(self):
+        try:
+            self.store.migrate()
+        except Exception as e:
+            self.log(f"❌ Memory migration failed: {e}")
+
+    def _initial_scan(self, paths=["G:/"]):
         self.log("🧭 Initial scan started...")
-        scanned = 0
-        for path in self.scan_files(["G:/"]):
-            if self.is_seen(path):
-                continue
-            self.reflect_file(path)
-            scanned += 1
-            time.sleep(0.2)
-        self._save_seen_paths()
+        scanned = self.run_scan(paths, name="initial")
         self.log(f"🧭 Initial scan complete. {scanned} new files reflected.")
 
     def enable_idle_scan(self, paths=["C:/", "G:/"], interval=900):
@@ -428,76 +2838,134 @@ class BrainBot:
         if getattr(self, "_is_training", False):
             time.sleep(interval)
       
+    def enable_watch(self, paths=["C:/", "G:/"], debounce=WATCH_DEBOUNCE):
+        watcher = FileWatcher(self, paths, debounce=debounce)
+        try:
+            if not watcher.start():
+                self.log("⚠️ watchdog not installed; falling back to polling idle scans.")
+                return False
+        except Exception as e:
+            self.log(f"⚠️ File watching unavailable ({e}); falling back to polling idle scans.")
+            return False
+        self._watcher = watcher
+        self.log(f"👁️ Watching {', '.join(paths)} for changes.")
+        return True
+
     def _idle_scan_loop(self, paths, interval):
         while True:
             self.log("🔄 Idle scan cycle started...")
-            scanned = 0
             if self._is_training:
                 time.sleep(interval)
                 continue
-            for path in self.scan_files(paths):
-                if self.is_seen(path):
-                    continue
-                self.reflect_file(path)
-                scanned += 1
-                time.sleep(0.5 + random.random() * 0.5)
-            self._save_seen_paths()
+            scanned = self.run_scan(paths, name="idle")
             self.log(f"🌙 Idle scan complete. {scanned} new files reflected.")
             time.sleep(interval)
 
-    def scan_files(self, roots):
-        for root in roots:
+    def enable_dream_scheduler(self, interval=DREAM_CHECK_INTERVAL):
+        threading.Thread(target=self._dream_scheduler_loop, args=(interval,), daemon=True).start()
+
+    def _dream_scheduler_loop(self, interval):
+        while True:
+            time.sleep(interval)
             try:
-                for dirpath, _, filenames in os.walk(root):
-                    for name in filenames:
-                        full = os.path.join(dirpath, name)
-                        ext = os.path.splitext(full)[1].lower()
-                        if ext in READABLE_EXTENSIONS + AUDIO_EXTENSIONS + VIDEO_EXTENSIONS:
-                            yield full
+                count = self.store.shortterm_count()
+                if count >= DREAM_HIGH_WATERMARK and self._ingest_open.is_set():
+                    self._ingest_open.clear()
+                    self.log(f"⏸️ Pausing ingestion: {count} reflections waiting to be dreamed.")
+                if self._is_training:
+                    continue
+                size_mb = self.store.shortterm_size_mb()
+                idle = time.monotonic() - self._last_activity
+                reason = None
+                if count >= DREAM_MAX_REFLECTIONS:
+                    reason = f"{count} reflections waiting"
+                elif size_mb >= DREAM_MAX_MB:
+                    reason = f"{size_mb:.0f} MB of reflections waiting"
+                elif count and idle >= DREAM_IDLE_SECONDS:
+                    reason = f"idle for {idle:.0f}s"
+                if reason:
+                    self.log(f"🌙 Scheduled dream: {reason}.")
+                    self.dream()
+                    count = self.store.shortterm_count()
+                if count < DREAM_MAX_REFLECTIONS and not self._ingest_open.is_set():
+                    self._ingest_open.set()
+                    self.log("▶️ Resuming ingestion.")
             except Exception as e:
-                self.log(f"⚠️ Failed to scan {root}: {e}")
+                self.log(f"⚠️ Dream scheduler error: {e}")
 
-    def is_seen(self, path):
+    def wait_for_shortterm_room(self):
+        # Backpressure: the dream scheduler closes this while short-term memory is over the high watermark
+        self._ingest_open.wait()
+
+    def _load_tagger(self):
+        lexicon_path = self.base / "lexicons.json"
         try:
-            return path in self._seen
+            if lexicon_path.exists():
+                return KeywordTagger.from_file(lexicon_path)
         except Exception as e:
-            self.log(f"⚠️ is_seen check failed for {path}: {e}")
-            return False
+            self.log(f"⚠️ Failed to load lexicons: {e}")
+        return KeywordTagger()
 
-    def _load_seen_paths(self):
+    def _load_scan_policy(self):
+        policy_path = self.base / "scan_policy.json"
         try:
-            if self.seen_path.exists():
-                with open(self.seen_path, "r", encoding="utf-8") as f:
-                    return set(json.load(f))
-            return set()
+            if policy_path.exists():
+                policy = ScanPolicy.from_file(policy_path)
+            else:
+                policy = ScanPolicy()
         except Exception as e:
-            self.log(f"⚠️ Failed to load seen paths: {e}")
-            return set()
-
-    def _save_seen_paths(self):
+            self.log(f"⚠️ Failed to load scan policy: {e}")
+            policy = ScanPolicy()
+        # Never reflect on our own memory files
+        policy.exclude.append(policy._norm(self.base / "memory") + "*")
+        return policy
+
+    def scan_files(self, roots, policy=None, cursor=None):
+        policy = policy or self.scan_policy
+        policy.reset_report()
+        cursor = cursor or ScanCursor(policy.order_roots(roots))
+        while cursor.stack or cursor.roots:
+            if not cursor.stack:
+                cursor.stack.append((cursor.roots.pop(0), 0))
+            directory, depth = cursor.stack.pop()
+            cursor.current = (directory, depth)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if policy.allow_dir(entry, depth + 1):
+                                    cursor.stack.append((entry.path, depth + 1))
+                            elif entry.is_file(follow_symlinks=False) and policy.allow_file(entry):
+                                yield entry.path
+                        except OSError:
+                            continue
+            except OSError as e:
+                if depth == 0:
+                    self.log(f"⚠️ Failed to scan {directory}: {e}")
+            cursor.current = None
+        report = policy.report
+        self.log(f"✂️ Scan pruned {report['dirs_pruned']} dirs and {report['files_pruned']} files; "
+                 f"{report['files_matched']} files matched.")
+
+    def is_seen(self, path, st=None):
         try:
-            with open(self.seen_path, "w", encoding="utf-8") as f:
-                json.dump(list(self._seen), f, indent=2)
-            self.log(f"💾 Saved {len(self._seen)} seen paths.")
+            entry = self.store.catalog_get(path)
+            if entry is None:
+                return False
+            st = st or os.stat(path)
+            if entry.get("mtime") is None:
+                self.store.catalog_put([dict(entry, mtime=st.st_mtime, size=st.st_size)])
+                return True
+            return entry["mtime"] == st.st_mtime and entry["size"] == st.st_size
         except Exception as e:
-            self.log(f"⚠️ Failed to save seen paths: {e}")
+            self.log(f"⚠️ is_seen check failed for {path}: {e}")
+            return False
 
     def append_answered_question(self, question, answer):
         try:
-            if self.answered_path.exists():
-                with open(self.answered_path, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-            else:
-                existing = []
-
-            existing.append({
-                "question": question.strip(),
-                "answer": answer.strip(),
-                "next": None
-            })
-
-            with open(self.answered_path, "w", encoding="utf-8") as f:
-                json.dump(existing, f, indent=2)
+            self.store.append_answered(question.strip(), answer.strip())
+            self.memory_index.add_answer(question.strip(), answer.strip())
 
             self.log(f"📘 Appended answered question: {question}")
         except Exception as e:
@@ -508,16 +2976,7 @@ class BrainBot:
             if not questions:
                 return
 
-            if self.questions_path.exists():
-                with open(self.questions_path, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-            else:
-                existing = []
-
-            existing.extend(questions)
-
-            with open(self.questions_path, "w", encoding="utf-8") as f:
-                json.dump(existing, f, indent=2)
+            self.store.append_questions(questions)
 
             self.log(f"❓ Appended {len(questions)} questions to question pool.")
         except Exception as e:
@@ -525,11 +2984,7 @@ class BrainBot:
 
     def generate_questions(self, content, source="unknown"):
         try:
-            lines = content.strip().splitlines()
-            questions = []
-            for line in lines:
-                if "?" in line and len(line) < 200:
-                    questions.append(line.strip())
+            questions = find_questions(content)
             self.log(f"❓ Generated {len(questions)} questions from {source}")
             return questions
         except Exception as e:
@@ -538,9 +2993,9 @@ class BrainBot:
 
     def get_status(self):
         try:
-            shortterm_count = len(list(self.short_term_dir.glob("reflection_*.json")))
-            longterm_size = os.path.getsize(self.long_term_path) / (1024 ** 2) if self.long_term_path.exists() else 0
-            seen_count = len(self._seen)
+            shortterm_count = self.store.shortterm_count()
+            longterm_size = self.store.longterm_size_mb()
+            seen_count = self.store.catalog_count()
             last_spoke = self._last_spoke.strftime("%Y-%m-%d %H:%M:%S")
             craving = "enabled" if self._craving_enabled else "disabled"
             return [
@@ -549,7 +3004,8 @@ class BrainBot:
                 f"📂 Files scanned: {seen_count}",
                 f"🕰️ Last spoke: {last_spoke}",
                 f"🔄 Craving: {craving}",
-                f"🌙 Idle scan: always running"
+                f"🌙 Idle scan: {'event-driven' if self._watcher else 'polling'}",
+                f"📥 Ingestion: {'running' if self._ingest_open.is_set() else 'paused until the next dream'}"
             ]
         except Exception as e:
             return [f"⚠️ Failed to retrieve status: {e}"]
@@ -606,47 +3062,49 @@ class BrainBot:
         try:
             if not reflections:
                 self.log("⚠️ No reflections to append.")
-                return
+                return []
 
-            if self.long_term_path.exists():
-                with open(self.long_term_path, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-            else:
-                existing = []
+            stored = self.store.append_longterm(reflections)
 
-            existing.extend(reflections)
-
-            with open(self.long_term_path, "w", encoding="utf-8") as f:
-                json.dump(existing, f, indent=2)
-
-            self.log(f"📦 Appended {len(reflections)} reflections to long-term memory.")
+            self.log(f"📦 Appended {len(stored)} reflections to long-term memory.")
+            if len(stored) < len(reflections):
+                self.log(f"♻️ Skipped {len(reflections) - len(stored)} reflections already in long-term memory.")
+            return stored
         except Exception as e:
             self.log(f"❌ Failed to append to long-term: {e}")
+            return []
 			
     def train_on_pairs_in_folder(self, folder_path=None):
         base_folder = Path(folder_path or self.base / "training")
         self.log(f"🧠 Beginning training ritual from: {base_folder}")
         trained_total = 0
-        self._is_training = True
+        with self._dream_lock:
+            # Waits out a dream that is already consolidating
+            self._is_training = True
 
         for file in base_folder.rglob("*"):
             if file.is_file() and file.suffix.lower() in READABLE_EXTENSIONS:
                 try:
-                    content = self.read_file(str(file))
-                    pairs = self.extract_training_pairs(content)
+                    document = read_document(str(file), file.suffix.lower(), self.document_max_bytes,
+                                             self.pdf_page_limit)
+                    if document.get("warning"):
+                        self.log(f"⚠️ {document['warning']} ({file})")
+                    pairs = document["pairs"]
+                    self.log(f"🔗 Extracted {len(pairs)} training pairs.")
                     if not pairs:
                         continue
                     self.train_on_pairs(pairs)
                     self.store_reflection(
                         role="trainer",
-                        content=content,
+                        content=document["content"],
                         glyph="🔥",
                         thoughts=f"Trained on {len(pairs)} pairs from {file.name}",
                         source_path=str(file),
                         extension=file.suffix,
                         source_type="training",
                         memory_tag="training",
-                        training_pairs=pairs
+                        training_pairs=pairs,
+                        summary=document["summary"]
                     )
                     trained_total += len(pairs)
                 except Exception as e:
@@ -656,64 +3114,37 @@ class BrainBot:
         self.log(f"✅ Training ritual complete. Total pairs trained: {trained_total}")
 
     def respond(self, user_input):
+        self._last_activity = time.monotonic()
         try:
-            if not self.long_term_path.exists():
+            self._ensure_memory_index()
+            if self.memory_index.empty():
                 self.log("⚠️ No long-term memory found.")
                 return "I have no memory of that."
 
-            reflections = []
-            longterm_dir = self.long_term_path.parent
-            permanent_dir = self.answered_path.parent
-
-            for folder in [longterm_dir, permanent_dir]:
-                for file in folder.glob("*.json"):
-                    try:
-                        with open(file, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            if isinstance(data, list):
-                                reflections.extend(data)
-                            elif isinstance(data, dict):
-                                reflections.append(data)
-                    except Exception as e:
-                        self.log(f"⚠️ Failed to read memory file: {file.name} — {e}")
-
             norm_input = self._normalize_question(user_input)
             mapped_input = self._synonym_map(norm_input)
-   
-            best_match = None
-            best_score = 0
-            best_output = None
 
-            for reflection in reflections:
-                pairs = reflection.get("training_pairs", [])
-                if isinstance(pairs, list):
-                    for input_text, output_text in pairs:
-                        norm_pair = self._normalize_question(input_text)
-                        mapped_pair = self._synonym_map(norm_pair)
-
-                    # Exact match
-                        if mapped_pair == mapped_input:
-                            self.log(f"🧠 Exact match: {input_text}")
-                            return output_text
-
-                    # Fuzzy match
-                        score = difflib.SequenceMatcher(None, mapped_input, mapped_pair).ratio()
-                        if score > best_score:
-                            best_score = score
-                            best_match = input_text
-                            best_output = output_text
-		            # Associative fallback
-                        associations = self.find_associations(mapped_input)
-                        if associations:
-                            glyps = [r.get("preview", "")[:120] for r in associations]
-                            self.log(f"🔗 Associative memory activated: {len(glyphs)} related glyphs found.")
-                            return "I found echoes in the archive:\n" + "\n— " + "\n— ".join(glyphs)
-
-            if best_score > 0.75:
+            # Exact match
+            match = self.memory_index.exact(mapped_input)
+            if match:
+                self.log(f"🧠 Exact match: {match[0]}")
+                return match[1]
+
+            # Fuzzy match
+            fuzzy = self.memory_index.fuzzy(mapped_input, threshold=FUZZY_THRESHOLD, top_k=self.fuzzy_top_k)
+            if fuzzy:
+                best_match, best_output, best_score = fuzzy
                 self.log(f"🔍 Fuzzy match ({best_score:.2f}): {best_match}")
                 return best_output
 
-        # Fallback: autonomous glyph
+            # Associative fallback
+            associations = self.find_associations(mapped_input)
+            if associations:
+                glyphs = [r.get("preview", "")[:120] for r in associations]
+                self.log(f"🔗 Associative memory activated: {len(glyphs)} related glyphs found.")
+                return "I found echoes in the archive:\n" + "\n— " + "\n— ".join(glyphs)
+
+            # Fallback: autonomous glyph
             self.log(f"❓ No match found for: {user_input}")
             return self.respond_to("autonomous")
 
@@ -721,7 +3152,18 @@ class BrainBot:
             self.log(f"⚠️ Failed to respond: {e}")
             return "Something went wrong while searching my memory."
 
-    
+    def _ensure_memory_index(self):
+        if self.memory_index.loaded or not self.memory_index.load_once(self._iter_memory_files):
+            return
+        self.log(f"🗂️ Memory index loaded with {len(self.memory_index)} pairs.")
+
+    def _iter_memory_files(self):
+        yield from self.store.iter_longterm()
+        try:
+            yield from self.store.iter_answered()
+        except Exception as e:
+            self.log(f"⚠️ Failed to read permanent memory: {e}")
+
     def _normalize_question(self, text):
         return text.strip().lower().replace("?", "").replace(".", "").replace(",", "")
 
@@ -745,22 +3187,8 @@ class BrainBot:
         return text
 
     def find_associations(self, keyword):
-        reflections = []
-        for folder in [self.long_term_path.parent, self.answered_path.parent]:
-            for file in folder.glob("*.json"):
-                try:
-                    with open(file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        if isinstance(data, list):
-                            reflections.extend(data)
-                        elif isinstance(data, dict):
-                            reflections.append(data)
-                except:
-                    continue
-
-        related = []
-        for r in reflections:
-            preview = r.get("preview", "").lower()
-            if keyword.lower() in preview:
-                related.append(r)
-        return related
+        related = self.store.search_previews(keyword)
+        if related is not None:
+            return related
+        self._ensure_memory_index()
+        return self.memory_index.associations(keyword)
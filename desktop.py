@@ -1,6 +1,5 @@
 #G:\brainbot\desktop.py
 import sys
-import time
 import threading
 from datetime import datetime
 from pathlib import Path
@@ -134,9 +133,12 @@ class DesktopInterface(QWidget):
 
         elif text.lower() == "/sensescreen":
             if hasattr(self, "senses"):
-                result = self.senses.sense_screen()
-                text = result.get("data", {}).get("text", "")
-                self.chat(f"🖥️ Screen OCR: {text}")
+                result = self.senses.sense_screen(incremental=False)
+                if result:
+                    text = result.get("data", {}).get("text", "")
+                    self.chat(f"🖥️ Screen OCR: {text}")
+                else:
+                    self.chat("⚠️ Screen sensing returned nothing.")
             else:
                 self.chat("⚠️ Senses module is not enabled.")
 
@@ -150,7 +152,7 @@ class DesktopInterface(QWidget):
             threading.Thread(target=train_and_dream, daemon=True).start()
 
         elif text.lower() == "/trainstatus":
-            count = len(list(self.brain.short_term_dir.glob("reflection_*.json")))
+            count = self.brain.store.shortterm_count()
             self.chat(f"🔥 Training reflections stored: {count}")
 
         elif text.startswith("/"):
@@ -160,12 +162,7 @@ class DesktopInterface(QWidget):
             response = self.brain.respond(text)
             self.chat(response)
     def run_full_scan(self):
-        for path in self.brain.scan_files(["C:/", "G:/"]):
-            if self.brain.is_seen(path):
-                continue
-            self.brain.reflect_file(path)
-            time.sleep(0.2)
-        self.brain._save_seen_paths()
+        self.brain.run_scan(["C:/", "G:/"], name="full")
         self.chat("✅ System scan complete. Reflections stored.")
 
     def resizeEvent(self, event):
@@ -2,46 +2,169 @@
 import threading
 import time
 import os
+import queue
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from senses.senses import SensesController
 
+SENSE_INTERVALS = {"screen": 15, "camera_image": 30, "audio": 20, "scan": 60}
+SENSE_TIMEOUTS = {"screen": 60, "camera_image": 15, "audio": 30, "scan": 600}
+SENSE_QUEUE_SIZE = 64
+
+class SenseJob:
+    def __init__(self, name, run, interval, timeout, modality=None):
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.timeout = timeout
+        self.modality = modality  # None for jobs with nothing to store
+        self.next_due = 0.0
+        self.future = None
+        self.started = None
+        self.timed_out = False
+        self.skipped = 0
+
 class SenseStream:
+    """Runs each modality on its own cadence instead of one serial loop.
+
+    A scheduler thread submits every due job to its own worker. A job still running when it comes
+    due again is skipped rather than queued, and a result that arrives after the job's timeout is
+    dropped as stale. Readings go through one bounded queue to a single writer that calls store,
+    so a slow memory backend never holds up sensing.
+    """
+
     def __init__(self, base_path, memory=None, log_function=None):
         self._running = False
+        self.base_path = Path(base_path)
+        self.log = log_function or (lambda msg: None)
+        self.jobs = []
+        self.results = queue.Queue(maxsize=SENSE_QUEUE_SIZE)
+        self._wake = threading.Event()
+        self._threads = []
+        self._pool = None
+        self._on_stop = []
+
+    def add_job(self, name, run, interval, timeout, modality=None):
+        self.jobs.append(SenseJob(name, run, interval, timeout, modality))
+
+    def start(self, store):
+        self._running = True
+        self._wake.clear()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.jobs)), thread_name_prefix="sense")
+        self._threads = [
+            threading.Thread(target=self._schedule_loop, daemon=True, name="sense-scheduler"),
+            threading.Thread(target=self._store_loop, args=(store,), daemon=True, name="sense-store")
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        for callback in self._on_stop:
+            callback()
+
+    def _schedule_loop(self):
+        while self._running:
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.future is not None:
+                    if not job.future.done():
+                        if not job.timed_out and now - job.started > job.timeout:
+                            job.timed_out = True
+                            self.log(f"⏱️ {job.name} sensing passed {job.timeout}s; its result will be dropped.")
+                        if now >= job.next_due:
+                            job.skipped += 1
+                            job.next_due = now + job.interval
+                        continue
+                    if job.skipped:
+                        self.log(f"⏭️ {job.name} skipped {job.skipped} turn(s) while still running.")
+                        job.skipped = 0
+                    job.future = None
+                if now >= job.next_due:
+                    job.started = now
+                    job.timed_out = False
+                    job.next_due = now + job.interval
+                    job.future = self._pool.submit(self._run_job, job)
+            self._wake.wait(0.25)
+
+    def _run_job(self, job):
+        try:
+            data = job.run()
+        except Exception as e:
+            self.log(f"❌ Sensory stream error ({job.name}): {e}")
+            return
+        if job.modality is not None and data is not None and not job.timed_out:
+            self.submit(job.modality, data, timeout=job.timeout)
+
+    def submit(self, modality, data, timeout=5):
+        try:
+            self.results.put((modality, data), timeout=timeout)
+        except queue.Full:
+            self.log(f"⚠️ Sense queue full; dropped a {modality} reading.")
+
+    def _store_loop(self, store):
+        while self._running or not self.results.empty():
+            try:
+                modality, data = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                store(modality, data)
+            except Exception as e:
+                self.log(f"❌ Failed to store {modality} reading: {e}")
 
-def start_sensory_stream(base_path, logic, memory=None, log=None, interval=30):
+def start_sensory_stream(base_path, logic, memory=None, log=None, interval=None, intervals=None, timeouts=None):
+    # interval, when given, is the old single cadence and applies to every modality
     controller = SenseStream(base_path=base_path, memory=memory, log_function=log)
     senses = SensesController(base_path=base_path, memory=memory, log_function=log)
     video_path = Path(base_path) / "memory" / "video"
     video_path.mkdir(parents=True, exist_ok=True)
+    intervals = {**SENSE_INTERVALS, **({name: interval for name in SENSE_INTERVALS} if interval else {}),
+                 **(intervals or {})}
+    timeouts = {**SENSE_TIMEOUTS, **(timeouts or {})}
 
-    def stream():
-        if log: log("🌌 Sensory stream initiated...")
-        controller._running = True
-        while controller._running:
-            try:
-                senses.sense_screen()
-                senses.sense_camera_image(save_path=video_path)
-                senses.sense_camera_video(duration=10, save_path=video_path)
-                senses.sense_audio()
-                logic.scan_and_analyze()
-                cleanup_raw_media(video_path, log=log)
-                time.sleep(interval)
-            except Exception as e:
-                if log: log(f"❌ Sensory stream error: {e}")
-                time.sleep(interval)
+    if log: log("🌌 Sensory stream initiated...")
+    # Clips are recorded as motion happens instead of a blind 10s capture every cycle
+    recorder = senses.start_camera_recording(save_path=video_path,
+                                             on_clip=lambda clip: controller.submit("camera_video", clip))
+    controller._on_stop.append(recorder.stop)
+
+    def scan():
+        logic.scan_and_analyze()
+        # Asked per file: a clip can start while the sweep is running
+        cleanup_raw_media(video_path, log=log, keep=lambda path: path == recorder.recording_path)
 
-    threading.Thread(target=stream, daemon=True).start()
-    return controller
+    # Only the stream reads the screen in delta mode; an unchanged screen yields nothing to store
+    controller.add_job("screen", lambda: senses.read_screen(incremental=True), intervals["screen"], timeouts["screen"],
+                       "screen")
+    controller.add_job("camera_image", lambda: senses.read_camera_image(save_path=video_path),
+                       intervals["camera_image"], timeouts["camera_image"], "camera_image")
+    controller.add_job("audio", senses.read_audio, intervals["audio"], timeouts["audio"], "audio")
+    controller.add_job("scan", scan, intervals["scan"], timeouts["scan"])
+    return controller.start(senses._store)
 
-def cleanup_raw_media(folder, log=None):
+def cleanup_raw_media(folder, log=None, keep=None):
     if log: log("🧹 Cleaning up raw media files...")
     try:
-        for filename in os.listdir(folder):
-            if filename.lower().endswith((".avi", ".wav", ".mp3", ".mp4", ".png", ".jpg", ".jpeg", ".bmp")):
-                path = os.path.join(folder, filename)
-                os.remove(path)
-                if log: log(f"🗑️ Deleted: {filename}")
+        filenames = os.listdir(folder)
     except Exception as e:
         if log: log(f"❌ Cleanup failed: {e}")
+        return
+    for filename in filenames:
+        if filename.lower().endswith((".avi", ".wav", ".mp3", ".mp4", ".png", ".jpg", ".jpeg", ".bmp")):
+            path = os.path.join(folder, filename)
+            if keep and keep(path):
+                continue  # Still being written
+            try:
+                os.remove(path)
+                if log: log(f"🗑️ Deleted: {filename}")
+            except Exception as e:
+                # On Windows a file still open elsewhere cannot be removed; the next sweep retries it
+                if log: log(f"⚠️ Could not delete {filename}: {e}")
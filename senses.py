@@ -4,9 +4,11 @@ from pathlib import Path
 from datetime import datetime
 
 from .video.video_sense import (
+    ScreenReader,
     record_screen,
     capture_webcam_image,
-    capture_webcam_video
+    capture_webcam_video,
+    start_motion_recording
 )
 from .audio.audio_sense import listen_and_transcribe
 
@@ -16,6 +18,7 @@ class SensesController:
         self.memory = memory
         self.log = log_function or (lambda msg: print(msg))
         self.chat = chat_function
+        self._screen_reader = None
 
     def _store(self, modality, data):
         if not data or not isinstance(data, dict):
@@ -51,15 +54,28 @@ class SensesController:
             "text": "📝"
         }.get(modality, "🔍")
 
-    def sense_screen(self, ocr=True):
+    # read_* return a modality's raw data without storing it, so a scheduler can queue it for _store
+
+    def read_screen(self, ocr=True, incremental=False):
         self.log("🖥️ Sensing screen...")
-        result = record_screen(ocr=ocr)
-        return self._store("screen", result)
+        if ocr and incremental and self._screen_reader is None:
+            self._screen_reader = ScreenReader()
+        result = record_screen(ocr=ocr, reader=self._screen_reader if incremental else None)
+        if result.get("text") == "(No new text)":
+            self.log("🖥️ Screen text unchanged; nothing to store.")
+            return None
+        return result
 
-    def sense_camera_image(self, save_path=None):
+    def sense_screen(self, ocr=True, incremental=False):
+        result = self.read_screen(ocr=ocr, incremental=incremental)
+        return self._store("screen", result) if result else None
+
+    def read_camera_image(self, save_path=None):
         self.log("📸 Sensing webcam image...")
-        result = capture_webcam_image(save_path=save_path)
-        return self._store("camera_image", result)
+        return capture_webcam_image(save_path=save_path)
+
+    def sense_camera_image(self, save_path=None):
+        return self._store("camera_image", self.read_camera_image(save_path=save_path))
 
     def sense_camera_video(self, duration=10, save_path=None):
         save_path = save_path or self.base_path / "memory" / "video"
@@ -67,11 +83,20 @@ class SensesController:
         result = capture_webcam_video(duration=duration, save_path=str(save_path))
         return self._store("camera_video", result)
 
-    def sense_audio(self, timeout=5, phrase_time_limit=10):
+    def start_camera_recording(self, save_path=None, on_clip=None, **options):
+        """Record clips whenever motion starts; each finished clip goes to on_clip or is stored as camera_video."""
+        save_path = save_path or self.base_path / "memory" / "video"
+        self.log("🎥 Motion recording armed.")
+        return start_motion_recording(save_path, on_clip=on_clip or (lambda clip: self._store("camera_video", clip)),
+                                      log=self.log, **options)
+
+    def read_audio(self, timeout=5, phrase_time_limit=10):
         self.log("🎙️ Sensing audio...")
+        return listen_and_transcribe(timeout=timeout, phrase_time_limit=phrase_time_limit)
+
+    def sense_audio(self, timeout=5, phrase_time_limit=10):
         try:
-            result = listen_and_transcribe(timeout=timeout, phrase_time_limit=phrase_time_limit)
-            return self._store("audio", result)
+            return self._store("audio", self.read_audio(timeout=timeout, phrase_time_limit=phrase_time_limit))
         except Exception as e:
             self.log(f"⚠️ Audio sensing failed: {e}")
             return None
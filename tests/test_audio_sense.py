@@ -0,0 +1,39 @@
+import numpy as np
+
+import audio_sense
+
+
+def _frame(rms, rng, samples=audio_sense.SAMPLE_RATE * audio_sense.FRAME_MS // 1000):
+    return (rng.standard_normal(samples) * rms).clip(-32768, 32767).astype(np.int16).tobytes()
+
+
+def _gate():
+    gate = audio_sense.VoiceGate()
+    gate._vad = None  # Energy only, so the test does not depend on webrtcvad being installed
+    return gate
+
+
+def test_noise_floor_follows_rising_then_falling_noise():
+    rng = np.random.default_rng(0)
+    gate = _gate()
+    for _ in range(100):
+        gate.feed(_frame(200, rng))
+    quiet_floor = gate.noise_floor
+
+    segments = []
+    for rms in np.geomspace(200, 2000, 600):
+        segments.append(gate.feed(_frame(rms, rng)))
+    for _ in range(300):
+        segments.append(gate.feed(_frame(2000, rng)))
+    assert gate.noise_floor > 5 * quiet_floor
+    assert not any(segments) and not gate.in_speech
+
+    # About a second of quiet is enough to recalibrate
+    for _ in range(30):
+        gate.feed(_frame(200, rng))
+    assert gate.noise_floor < 1.5 * quiet_floor
+
+    # A voice the loud room would have masked opens a segment again
+    for _ in range(30):
+        gate.feed(_frame(1200, rng))
+    assert gate.in_speech
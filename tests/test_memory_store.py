@@ -0,0 +1,33 @@
+import builtins
+
+import pytest
+
+import brainbot
+
+
+def _reflections(count):
+    return [{"id": f"r{i}", "content": f"reflection {i}"} for i in range(count)]
+
+
+def test_append_longterm_retries_after_failed_write(tmp_path, monkeypatch):
+    store = brainbot.JsonMemoryStore(tmp_path, log=lambda msg: None)
+    failures = [1]
+
+    def flaky_open(path, *args, **kwargs):
+        if failures and str(path) == str(store.long_term_path):
+            failures.pop()
+            raise OSError("disk full")
+        return builtins.open(path, *args, **kwargs)
+
+    monkeypatch.setattr(brainbot, "open", flaky_open, raising=False)
+    with pytest.raises(OSError):
+        store.append_longterm(_reflections(5))
+
+    assert len(store.append_longterm(_reflections(5))) == 5
+    assert sorted(r["id"] for r in store.iter_longterm()) == [f"r{i}" for i in range(5)]
+
+
+def test_append_longterm_skips_stored_ids(tmp_path):
+    store = brainbot.JsonMemoryStore(tmp_path, log=lambda msg: None)
+    store.append_longterm(_reflections(3))
+    assert [r["id"] for r in store.append_longterm(_reflections(4))] == ["r3"]
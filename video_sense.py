@@ -7,9 +7,97 @@ from datetime import datetime
 import cv2
 import numpy as np
 import os
+import threading
+import time
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def record_screen(ocr=True):
+MOTION_THRESHOLD = 0.01  # Share of background pixels that must change to count as motion
+CAMERA_IDLE_SECONDS = 300  # The device is released after this long without a caller
+PRE_ROLL_SECONDS = 2  # Held in memory: about 55 MB at 640x480 and 30 fps
+QUIET_SECONDS = 5
+MAX_CLIP_SECONDS = 120
+SCREEN_TILE_GRID = (2, 8)  # Columns, rows; wide tiles keep most lines of text whole
+SCREEN_TILE_MARGIN = 12  # Pixels of neighbouring tiles OCR'd along with a tile so edge words survive
+SCREEN_OCR_SCALE = 1.0  # Lower it on HiDPI screens where text is large
+SCREEN_OCR_WORKERS = 4
+
+class ScreenReader:
+    """Incremental screen OCR: only tiles whose pixels changed since the previous read are OCR'd.
+
+    Tiles are compared by a hash of their grayscale pixels and each tile's text is cached, so a
+    read reports just the lines that were not in those tiles before.
+    """
+
+    def __init__(self, grid=SCREEN_TILE_GRID, margin=SCREEN_TILE_MARGIN, scale=SCREEN_OCR_SCALE,
+                 workers=SCREEN_OCR_WORKERS):
+        self.columns, self.rows = grid
+        self.margin = margin
+        self.scale = scale
+        self._tiles = {}
+        self._size = None
+        # pytesseract runs one tesseract process per call, so threads are enough to overlap them
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screen-ocr")
+
+    def _boxes(self, width, height):
+        for row in range(self.rows):
+            for col in range(self.columns):
+                yield (col, row), (width * col // self.columns, height * row // self.rows,
+                                   width * (col + 1) // self.columns, height * (row + 1) // self.rows)
+
+    def _ocr(self, gray, box):
+        height, width = gray.shape
+        x0, y0, x1, y1 = box
+        tile = Image.fromarray(gray[max(0, y0 - self.margin):min(height, y1 + self.margin),
+                                    max(0, x0 - self.margin):min(width, x1 + self.margin)])
+        if self.scale != 1.0:
+            tile = tile.resize((max(1, int(tile.width * self.scale)), max(1, int(tile.height * self.scale))),
+                               Image.LANCZOS)
+        return pytesseract.image_to_string(tile)
+
+    def reset(self):
+        self._tiles.clear()
+
+    def read(self, screenshot=None):
+        screenshot = screenshot or pyautogui.screenshot()
+        gray = np.asarray(screenshot.convert("L"))
+        if gray.shape != self._size:
+            self._tiles.clear()  # Resolution changed; every tile is new
+            self._size = gray.shape
+        height, width = gray.shape
+
+        changed = []
+        for key, (x0, y0, x1, y1) in self._boxes(width, height):
+            digest = hashlib.blake2b(gray[y0:y1, x0:x1].tobytes(), digest_size=16).digest()
+            cached = self._tiles.get(key)
+            if cached is None or cached[0] != digest:
+                changed.append((key, (x0, y0, x1, y1), digest))
+
+        delta = []
+        emitted = set()
+        texts = self._pool.map(lambda item: self._ocr(gray, item[1]), changed)
+        for (key, _, digest), text in zip(changed, texts):
+            seen = {line.strip() for line in self._tiles.get(key, (None, ""))[1].splitlines()}
+            for line in text.splitlines():
+                line = line.strip()
+                if line and line not in seen and line not in emitted:
+                    emitted.add(line)
+                    delta.append(line)
+            self._tiles[key] = (digest, text)
+        return {
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "mode": "screen + OCR delta",
+            "text": "\n".join(delta) or "(No new text)",
+            "changed_tiles": len(changed),
+            "tiles": self.columns * self.rows
+        }
+
+def record_screen(ocr=True, reader=None):
     try:
+        if ocr and reader is not None:
+            return reader.read()
+
         screenshot = pyautogui.screenshot()
         timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -34,39 +122,282 @@ def record_screen(ocr=True):
             "text": f"⚠️ Screen capture failed: {e}"
         }
 
-def motion_detected(threshold=50000):
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        return False
+class CameraSession:
+    """One long-lived webcam stream shared by motion checks, stills and clips.
+
+    A grabber thread keeps reading frames, so the device is opened once and callers get the newest
+    frame without reinitialising the driver. Motion is scored against a running-average background of
+    small grayscale frames, and the peak score is kept until the next motion_score() call so motion
+    between sensing cycles is not missed. Frames handed out are shared; treat them as read-only.
+    """
+
+    def __init__(self, device=0, motion_size=(160, 120), alpha=0.05, pixel_threshold=25, warmup=10,
+                 idle_seconds=CAMERA_IDLE_SECONDS):
+        self.device = device
+        self.motion_size = motion_size
+        self.alpha = alpha
+        self.pixel_threshold = pixel_threshold
+        self.warmup = warmup
+        self.idle_seconds = idle_seconds
+        self.error = None
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition()
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self._frame = None
+        self._seq = 0
+        self._background = None
+        self._peak = 0.0
+        self._score = 0.0
+        self._scored = 0
+        self._stamps = deque(maxlen=30)
+        self._last_used = time.monotonic()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def fps(self):
+        with self._frame_ready:
+            if len(self._stamps) < 2 or self._stamps[-1] == self._stamps[0]:
+                return None
+            return (len(self._stamps) - 1) / (self._stamps[-1] - self._stamps[0])
+
+    def start(self):
+        with self._lock:
+            self._last_used = time.monotonic()
+            if self.running:
+                return True
+            cap = cv2.VideoCapture(self.device)
+            if not cap.isOpened():
+                cap.release()
+                self.error = "Webcam not accessible."
+                return False
+            with self._frame_ready:
+                self._reset()
+            self.error = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._grab_loop, args=(cap,), daemon=True,
+                                            name=f"camera-{self.device}")
+            self._thread.start()
+            return True
 
-    ret, frame1 = cap.read()
-    ret, frame2 = cap.read()
-    cap.release()
+    def stop(self):
+        with self._lock:
+            thread = self._thread
+            self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
 
-    if not ret:
-        return False
+    def _motion(self, frame):
+        small = cv2.resize(frame, self.motion_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        if self._background is None:
+            self._background = gray.astype(np.float32)
+            return 0.0
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        cv2.accumulateWeighted(gray, self._background, self.alpha)
+        return np.count_nonzero(diff > self.pixel_threshold) / diff.size
 
-    gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-    gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-    diff = cv2.absdiff(gray1, gray2)
-    _, thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-    motion_score = np.sum(thresh)
+    def _grab_loop(self, cap):
+        misses = 0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - self._last_used > self.idle_seconds:
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    misses += 1
+                    if misses >= 50:
+                        self.error = "Webcam stopped delivering frames."
+                        break
+                    time.sleep(0.05)
+                    continue
+                misses = 0
+                score = self._motion(frame)
+                with self._frame_ready:
+                    self._frame = frame
+                    self._seq += 1
+                    self._score = score if self._seq > self.warmup else 0.0
+                    self._peak = max(self._peak, self._score)
+                    self._stamps.append(time.monotonic())
+                    self._frame_ready.notify_all()
+        finally:
+            cap.release()
+            with self._frame_ready:
+                self._frame_ready.notify_all()
 
-    return motion_score > threshold
+    def read_scored(self, after=0, timeout=2.0):
+        """(sequence number, frame, motion score) of the newest frame after the given one, or (after, None, 0.0)."""
+        if not self.start():
+            return after, None, 0.0
+        deadline = time.monotonic() + timeout
+        with self._frame_ready:
+            while self._seq <= after and self.running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._frame_ready.wait(remaining)
+            if self._seq <= after:
+                return after, None, 0.0
+            return self._seq, self._frame, self._score
+
+    def read(self, after=0, timeout=2.0):
+        """(sequence number, frame) of the newest frame after the given one, or (after, None)."""
+        seq, frame, _ = self.read_scored(after, timeout)
+        return seq, frame
+
+    def motion_score(self, timeout=3.0):
+        """Peak share of changed pixels since the last call, or None without a camera."""
+        # Waits for the background to settle and for at least one frame the last call did not see
+        seq, frame = self.read(after=max(self.warmup, self._scored), timeout=timeout)
+        if frame is None:
+            return None
+        with self._frame_ready:
+            score, self._peak = self._peak, 0.0
+            self._scored = self._seq
+        return score
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def camera_session(device=0):
+    with _sessions_lock:
+        session = _sessions.get(device)
+        if session is None:
+            session = _sessions[device] = CameraSession(device)
+        return session
+
+class MotionRecorder:
+    """Records clips only while something moves in front of the camera.
+
+    The last PRE_ROLL_SECONDS of frames wait in a ring buffer. When a frame's motion score crosses
+    the threshold they are written first, then live frames follow until the scene has been quiet
+    for quiet_seconds (or the clip reaches max_seconds). Clips are encoded at the stream's measured
+    frame rate, and on_clip receives the same dict capture_webcam_video returns.
+    """
+
+    def __init__(self, save_path, session=None, threshold=MOTION_THRESHOLD, pre_roll_seconds=PRE_ROLL_SECONDS,
+                 quiet_seconds=QUIET_SECONDS, max_seconds=MAX_CLIP_SECONDS, on_clip=None, log=None):
+        self.save_path = str(save_path)
+        self.session = session or camera_session()
+        self.threshold = threshold
+        self.pre_roll_seconds = pre_roll_seconds
+        self.quiet_seconds = quiet_seconds
+        self.max_seconds = max_seconds
+        self.on_clip = on_clip
+        self.log = log or (lambda msg: None)
+        self.recording_path = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="motion-recorder")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def _open_clip(self, frame):
+        os.makedirs(self.save_path, exist_ok=True)
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.save_path, f"webcam_{timestamp}.avi")
+        fps = self.session.fps or 20
+        height, width = frame.shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'XVID'), fps, (width, height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Cannot open video writer for {path}")
+        self.recording_path = path
+        return writer, {"status": "success", "path": path, "fps": round(fps, 1), "timestamp": timestamp}
+
+    def _close_clip(self, writer, clip, frames, started):
+        try:
+            writer.release()
+        finally:
+            self.recording_path = None
+        clip.update(duration=round(time.monotonic() - started, 1), frames=frames)
+        self.log(f"🎥 Motion clip saved: {clip['path']} ({clip['duration']}s)")
+        if self.on_clip:
+            try:
+                self.on_clip(clip)
+            except Exception as e:
+                self.log(f"⚠️ Motion clip handler failed: {e}")
+
+    def _run(self):
+        pre_roll = deque()
+        writer = None
+        seq = 0
+        while not self._stop.is_set():
+            try:
+                seq, frame, score = self.session.read_scored(after=seq)
+                if frame is None:
+                    if not self.session.running:
+                        self._stop.wait(5)  # No camera right now; try again shortly
+                    continue
+                now = time.monotonic()
+                if writer is None:
+                    pre_roll.append((now, frame))
+                    while now - pre_roll[0][0] > self.pre_roll_seconds:
+                        pre_roll.popleft()
+                    if score <= self.threshold:
+                        continue
+                    writer, clip = self._open_clip(frame)
+                    started = pre_roll[0][0]
+                    last_motion = now
+                    frames = 0
+                    for _, buffered in pre_roll:
+                        writer.write(buffered)
+                        frames += 1
+                    pre_roll.clear()
+                    continue
+                writer.write(frame)
+                frames += 1
+                if score > self.threshold:
+                    last_motion = now
+                if now - last_motion > self.quiet_seconds or now - started > self.max_seconds:
+                    self._close_clip(writer, clip, frames, started)
+                    writer = None
+            except Exception as e:
+                # One bad clip (full disk, writer error) must not end the monitoring
+                self.log(f"⚠️ Motion recording failed: {e}")
+                pre_roll.clear()
+                if writer is not None:
+                    self._abandon_clip(writer, clip, frames, started)
+                    writer = None
+                self._stop.wait(1)
+        if writer is not None:
+            self._abandon_clip(writer, clip, frames, started)
+
+    def _abandon_clip(self, writer, clip, frames, started):
+        try:
+            self._close_clip(writer, clip, frames, started)
+        except Exception as e:
+            self.log(f"⚠️ Failed to close motion clip {clip['path']}: {e}")
+
+def start_motion_recording(save_path, on_clip=None, log=None, **options):
+    return MotionRecorder(save_path, on_clip=on_clip, log=log, **options).start()
+
+def motion_detected(threshold=MOTION_THRESHOLD, session=None):
+    score = (session or camera_session()).motion_score()
+    return score is not None and score > threshold
 
 def capture_webcam_image(save_path=None):
-    if not motion_detected():
+    session = camera_session()
+    if not motion_detected(session=session):
         return {"status": "skipped", "message": "🧘 No motion detected. Image capture skipped."}
 
     try:
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            return {"status": "error", "message": "⚠️ Webcam not accessible."}
-
-        ret, frame = cap.read()
-        cap.release()
-
-        if not ret:
+        _, frame = session.read()
+        if frame is None:
             return {"status": "error", "message": "⚠️ Failed to capture image from webcam."}
 
         timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
@@ -79,23 +410,23 @@ def capture_webcam_image(save_path=None):
             cv2.imwrite(full_path, frame)
             return {"status": "success", "path": full_path, "timestamp": timestamp}
         else:
-            return {"status": "success", "image": frame, "timestamp": timestamp}
+            return {"status": "success", "image": frame.copy(), "timestamp": timestamp}
 
     except Exception as e:
         return {"status": "error", "message": f"⚠️ Webcam capture failed: {e}"}
 
 def capture_webcam_video(duration=10, save_path="G:\\Dream\\Core\\memory\\video"):
-    if not motion_detected():
+    session = camera_session()
+    if not motion_detected(session=session):
         return {"status": "skipped", "message": "🧘 No motion detected. Video capture skipped."}
 
     try:
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        seq, frame = session.read()
+        if frame is None:
             return {"status": "error", "message": "⚠️ Webcam not accessible."}
 
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = 20
+        height, width = frame.shape[:2]
+        fps = session.fps or 20
         timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"webcam_{timestamp}.avi"
         if save_path and not os.path.exists(save_path):
@@ -105,20 +436,21 @@ def capture_webcam_video(duration=10, save_path="G:\\Dream\\Core\\memory\\video"
         fourcc = cv2.VideoWriter_fourcc(*'XVID')
         out = cv2.VideoWriter(full_path, fourcc, fps, (width, height))
 
-        start_time = datetime.utcnow()
-        while (datetime.utcnow() - start_time).total_seconds() < duration:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        frames = 0
+        start_time = time.monotonic()
+        while frame is not None and time.monotonic() - start_time < duration:
             out.write(frame)
+            frames += 1
+            seq, frame = session.read(after=seq)
 
-        cap.release()
         out.release()
 
         return {
             "status": "success",
             "path": full_path,
             "duration": duration,
+            "frames": frames,
+            "fps": round(fps, 1),
             "timestamp": timestamp
         }
 